@@ -1698,10 +1698,10 @@ def web(host: str | None, port: int | None, dev: bool) -> None:
     except ImportError:
         # Fallback: poll mtime every second
         print("[dev] inotify unavailable — polling every 1s")
-        mtimes: dict[Path, float] = {}
+        mtimes: dict[Path, int] = {}
 
-        def _snapshot() -> dict[Path, float]:
-            return {p: p.stat().st_mtime for p in kg_src.rglob("*.py")}
+        def _snapshot() -> dict[Path, int]:
+            return {p: p.stat().st_mtime_ns for p in kg_src.rglob("*.py")}
 
         mtimes = _snapshot()
         while True:
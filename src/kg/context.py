@@ -101,10 +101,8 @@ def build_context(
             tp = resolve_session_transcript(session_id)
             if tp:
                 fp = fingerprint_transcript(tp)
-                # Extract [slug] cross-refs from transcript for score boosting
-                import re as _re
-                for _slug in _re.findall(r"\[\[([a-z_][a-z0-9_]+-[a-z][a-z0-9_-]*[a-z0-9])\]\]", fp.text):
-                    session_ref_slugs.add(_slug)
+                # [slug] cross-refs from transcript for score boosting
+                session_ref_slugs = fp.slugs
 
     raw = search_fts(query, db_path, limit=limit * 3, cfg=cfg)
 
@@ -137,13 +135,17 @@ def build_context(
                 if slug is not None and not slug.startswith(_INTERNAL_PREFIX):
                     vec_scores[slug] = float(score)
 
-    # Load nodes to get vote scores + fill vector-only hits
-    store_for_vec = FileStore(nodes_dir)
+    # Load nodes to get vote scores + fill vector-only hits.  Loaded nodes are
+    # kept in `nodes` and reused by the rerank and packing passes below.
+    store = FileStore(nodes_dir)
+    to_load = [
+        slug for slug in list(groups) + [s for s in vec_scores if s not in groups]
+        if not (seen_slugs and slug in seen_slugs)
+    ]
+    nodes = store.get_many(to_load)
     vote_multipliers: dict[str, float] = {}
-    for slug in list(groups) + [s for s in vec_scores if s not in groups]:
-        if seen_slugs and slug in seen_slugs:
-            continue
-        node = store_for_vec.get(slug)
+    for slug in to_load:
+        node = nodes.get(slug)
         if node is None:
             continue
         live = node.live_bullets
@@ -162,10 +164,11 @@ def build_context(
         _rq = rerank_query or query
         with contextlib.suppress(Exception):
             from kg.reranker import rerank as _rerank
-            store_tmp = FileStore(nodes_dir)
+            _top = sorted_slugs[:min(len(sorted_slugs), limit * 2)]
+            nodes.update(store.get_many(s for s in _top if s not in nodes))
             candidates: list[tuple[str, str]] = []
-            for _slug in sorted_slugs[:min(len(sorted_slugs), limit * 2)]:
-                _node = store_tmp.get(_slug)
+            for _slug in _top:
+                _node = nodes.get(_slug)
                 if _node is None:
                     continue
                 _text = _node.title + " " + " ".join(b.text for b in _node.live_bullets[:5])
@@ -177,7 +180,6 @@ def build_context(
                 rest = [s for s in sorted_slugs if s not in {s for s, _ in candidates}]
                 sorted_slugs = reranked_order + rest
 
-    store = FileStore(nodes_dir)
     packed_nodes: list[ContextNode] = []
     total_chars = 0
     explore_reserve = 200  # reserve chars for the trailing "↳ Explore:" line
@@ -188,7 +190,7 @@ def build_context(
         if total_chars >= effective_budget:
             break
 
-        node = store.get(slug)
+        node = nodes[slug] if slug in nodes else store.get(slug)
         if node is None:
             continue
 
@@ -200,7 +202,7 @@ def build_context(
         if fp is not None:
             bullets = [
                 (bid, text) for bid, text in bullets
-                if bid not in fp.ids and (not fp.text or text not in fp.text)
+                if bid not in fp.ids and (not fp.text or fp.text.find(text.encode()) < 0)
             ]
             if not bullets:
                 continue
@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import contextlib
 import sqlite3
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from pathlib import Path
 
     from kg.config import KGConfig
@@ -50,3 +52,69 @@ def cfg_from_path(db_path: Path) -> sqlite3.Connection:
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
     return conn
+
+
+# Pragmas for the long-lived writer (the watcher). WAL lets readers keep going
+# during a flush, synchronous=NORMAL fsyncs only at checkpoints. Readers need no
+# extra setup: sqlite3.connect() already waits 5s (timeout=5.0) on a busy DB.
+_WRITER_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA wal_autocheckpoint=1000",
+)
+
+
+def tune_writer(conn: sqlite3.Connection) -> None:
+    """Apply _WRITER_PRAGMAS to a local connection (per-connection settings)."""
+    for pragma in _WRITER_PRAGMAS:
+        conn.execute(pragma)
+
+
+@contextlib.contextmanager
+def batch_writer(db_path: Path) -> Iterator[sqlite3.Connection]:
+    """Yield a local SQLite connection holding one write transaction.
+
+    Opens with BEGIN IMMEDIATE and commits once on exit (rolls back on error),
+    so indexers handed this connection share a single commit instead of one
+    per node/file. Keep the block short: it holds the write lock throughout.
+    """
+    from kg.indexer import _ensure_schema
+
+    conn = cfg_from_path(db_path)
+    try:
+        tune_writer(conn)
+        _ensure_schema(conn)  # executescript() commits, so run it before BEGIN
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@contextlib.contextmanager
+def write_scope(conn: sqlite3.Connection) -> Iterator[None]:
+    """Make the enclosed writes atomic without taking over the caller's transaction.
+
+    Inside an open transaction (e.g. batch_writer) this is a SAVEPOINT, so the
+    owner of the transaction decides when to commit. Otherwise it is the usual
+    ``with conn:`` commit/rollback.
+    """
+    if not getattr(conn, "in_transaction", False):
+        with conn:
+            yield
+        return
+    conn.execute("SAVEPOINT kg_write")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK TO kg_write")
+        conn.execute("RELEASE kg_write")
+        raise
+    conn.execute("RELEASE kg_write")
@@ -4,11 +4,15 @@ from __future__ import annotations
 
 import hashlib
 import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     import numpy as np
     from diskcache import Cache
     from fastembed import TextEmbedding
@@ -350,6 +354,67 @@ class CachedEmbedder:
         return [r for r in results if r is not None]
 
 
+# ---------------------------------------------------------------------------
+# EmbeddingMemo
+# ---------------------------------------------------------------------------
+
+class EmbeddingMemo:
+    """Thread-safe in-memory LRU of embeddings, keyed by (task_type, context, text).
+
+    Sits in front of the model (and the disk cache) so repeated texts skip both.
+    Keys are 16-byte blake2b digests; values are the float32 vectors.
+    """
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[bytes, NDArray[np.float32]] = OrderedDict()  # pyright: ignore[reportUndefinedVariable]
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(text: str, context: str, task_type: str) -> bytes:
+        """Content-addressed key for one embedding request."""
+        raw = f"{task_type}\0{context}\0{text}".encode()
+        return hashlib.blake2b(raw, digest_size=16).digest()
+
+    def get(self, key: bytes) -> NDArray[np.float32] | None:  # pyright: ignore[reportUndefinedVariable]
+        """Return the cached vector (marking it recently used) or None."""
+        with self._lock:
+            vec = self._data.get(key)
+            if vec is not None:
+                self._data.move_to_end(key)
+            return vec
+
+    def put(self, key: bytes, vector: NDArray[np.float32]) -> None:  # pyright: ignore[reportUndefinedVariable]
+        """Insert a vector, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = vector
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def embed(
+        self,
+        texts: list[str],
+        context: str,
+        task_type: str,
+        compute: Callable[[list[str]], list[NDArray[np.float32]]],  # pyright: ignore[reportUndefinedVariable]
+    ) -> list[NDArray[np.float32]]:  # pyright: ignore[reportUndefinedVariable]
+        """Return vectors for texts, calling compute() only for the misses."""
+        keys = [self.key(t, context, task_type) for t in texts]
+        results = [self.get(k) for k in keys]
+        miss: dict[bytes, str] = {}  # unique misses, first-seen order
+        for k, t, r in zip(keys, texts, results, strict=True):
+            if r is None:
+                miss.setdefault(k, t)
+        if miss:
+            computed = compute(list(miss.values()))
+            for k, vec in zip(miss, computed, strict=True):
+                self.put(k, vec)
+            fresh = dict(zip(miss, computed, strict=True))
+            results = [r if r is not None else fresh[k] for k, r in zip(keys, results, strict=True)]
+        return [r for r in results if r is not None]
+
+
 # ---------------------------------------------------------------------------
 # Factory helpers
 # ---------------------------------------------------------------------------
@@ -18,6 +18,7 @@ This reuses the existing FTS5 index on bullets.text, so `kg search` and
 from __future__ import annotations
 
 import hashlib
+import os
 import sqlite3
 import subprocess
 from datetime import UTC, datetime
@@ -26,8 +27,11 @@ from pathlib import Path
 from typing import TYPE_CHECKING
 
 from kg._vendor.fastcdc import fastcdc_py  # Cython-accelerated if built, else pure Python
+from kg.db import write_scope
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from kg.config import SourceConfig
 
 # Chunk size parameters (bytes; ~4 chars/token)
@@ -167,14 +171,47 @@ def _git_files(source_path: Path) -> list[Path] | None:
         return None
 
 
+def _walk_files(root: Path) -> Iterator[os.DirEntry[str]]:
+    """Yield files under root via os.scandir (types come from the dirent, no stat per path)."""
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry
+                except OSError:
+                    continue
+
+
 def _glob_files(source_path: Path, include: list[str], exclude: list[str]) -> list[Path]:
-    """Glob-based file discovery respecting include/exclude patterns."""
+    """Glob-based file discovery respecting include/exclude patterns.
+
+    Name-only patterns ("**/*.py" → "*.py") share a single scandir walk;
+    patterns with a directory part fall back to rglob.
+    """
     def _excluded(rel: str) -> bool:
         return any(fnmatch(rel, pat.lstrip("/")) for pat in exclude)
 
+    patterns = [pat.lstrip("*").lstrip("/") for pat in include]
+    name_pats = [pat for pat in patterns if "/" not in pat]
     files: list[Path] = []
-    for pattern in include:
-        for p in source_path.rglob(pattern.lstrip("*").lstrip("/")):
+    if name_pats:
+        prefix_len = len(str(source_path).rstrip("/")) + 1
+        for entry in _walk_files(source_path):
+            if any(fnmatch(entry.name, pat) for pat in name_pats):
+                if not _excluded(entry.path[prefix_len:]):
+                    files.append(Path(entry.path))
+    for pattern in patterns:
+        if "/" not in pattern:
+            continue
+        for p in source_path.rglob(pattern):
             if p.is_file():
                 rel = str(p.relative_to(source_path))
                 if not _excluded(rel):
@@ -269,48 +306,47 @@ def index_file(
         conn.execute("PRAGMA foreign_keys=ON")
         ensure_file_schema(conn)
 
-    with conn:
-        # Check if unchanged
-        row = conn.execute(
-            "SELECT content_hash FROM file_sources WHERE path = ?", (str(path),)
-        ).fetchone()
-        if row and row[0] == content_hash:
-            if own_conn:
-                conn.close()
-            return slug  # unchanged
-
-        # Wipe old data
-        conn.execute("DELETE FROM nodes WHERE slug = ?", (slug,))
-        conn.execute("DELETE FROM file_sources WHERE path = ?", (str(path),))
+    try:
+        with write_scope(conn):
+            # Check if unchanged
+            row = conn.execute(
+                "SELECT content_hash FROM file_sources WHERE path = ?", (str(path),)
+            ).fetchone()
+            if row and row[0] == content_hash:
+                return slug  # unchanged
 
-        title = rel_path
-        conn.execute(
-            "INSERT INTO nodes(slug, title, type, created_at, bullet_count) VALUES (?, ?, ?, ?, ?)",
-            (slug, title, "doc", now, 0),
-        )
+            # Wipe old data
+            conn.execute("DELETE FROM nodes WHERE slug = ?", (slug,))
+            conn.execute("DELETE FROM file_sources WHERE path = ?", (str(path),))
 
-        chunks = _fastcdc_chunks(text)
-        for idx, chunk in enumerate(chunks):
-            cid = _chunk_id(slug, idx)
+            title = rel_path
             conn.execute(
-                "INSERT OR REPLACE INTO bullets(id, node_slug, type, text, created_at) "
-                "VALUES (?, ?, ?, ?, ?)",
-                (cid, slug, "chunk", chunk, now),
+                "INSERT INTO nodes(slug, title, type, created_at, bullet_count) VALUES (?, ?, ?, ?, ?)",
+                (slug, title, "doc", now, 0),
             )
 
-        conn.execute(
-            "UPDATE nodes SET bullet_count = ? WHERE slug = ?",
-            (len(chunks), slug),
-        )
+            chunks = _fastcdc_chunks(text)
+            for idx, chunk in enumerate(chunks):
+                cid = _chunk_id(slug, idx)
+                conn.execute(
+                    "INSERT OR REPLACE INTO bullets(id, node_slug, type, text, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (cid, slug, "chunk", chunk, now),
+                )
 
-        conn.execute(
-            "INSERT OR REPLACE INTO file_sources(path, rel_path, content_hash, slug, source_name, indexed_at) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (str(path), rel_path, content_hash, slug, source_name, now),
-        )
+            conn.execute(
+                "UPDATE nodes SET bullet_count = ? WHERE slug = ?",
+                (len(chunks), slug),
+            )
 
-    if own_conn:
-        conn.close()
+            conn.execute(
+                "INSERT OR REPLACE INTO file_sources(path, rel_path, content_hash, slug, source_name, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (str(path), rel_path, content_hash, slug, source_name, now),
+            )
+    finally:
+        if own_conn:
+            conn.close()
     return slug
 
 
@@ -345,11 +381,17 @@ def index_source(
     *,
     db_path: Path,
     verbose: bool = False,
+    stat_cache: dict[str, tuple] | None = None,
 ) -> dict[str, int]:
     """Index all files in a source. Returns stats: new, updated, unchanged, skipped, deleted.
 
     Uses a single shared DB connection for the entire batch to avoid
     the overhead of opening/closing ~2N connections for N files.
+
+    *stat_cache* maps absolute path -> (st_ino, st_mtime_ns, st_size, ...) as of
+    the last index. A file already in file_sources whose stat still matches is
+    counted unchanged without being read. Entries for files verified or indexed
+    here are refreshed to (ino, mtime_ns, size, None); the caller owns the last slot.
     """
     files = collect_files(source)
     source_path = source.abs_path
@@ -391,7 +433,13 @@ def index_source(
                 "SELECT content_hash FROM file_sources WHERE path = ?", (str(p),)
             ).fetchone()
 
-            if p.stat().st_size > source.max_size_kb * 1024 or _is_binary(p):
+            st = p.stat()
+            sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if row and stat_cache is not None and stat_cache.get(str(p), ())[:3] == sig:
+                stats["unchanged"] += 1
+                continue
+
+            if st.st_size > source.max_size_kb * 1024 or _is_binary(p):
                 stats["skipped"] += 1
                 continue
 
@@ -404,6 +452,8 @@ def index_source(
             new_hash = _content_hash(text)
             if row and row[0] == new_hash:
                 stats["unchanged"] += 1
+                if stat_cache is not None:
+                    stat_cache[str(p)] = (*sig, None)
                 continue
 
             was_new = row is None
@@ -416,6 +466,8 @@ def index_source(
                 conn=conn,
             )
             if result:
+                if stat_cache is not None:
+                    stat_cache[str(p)] = (*sig, None)
                 if was_new:
                     stats["new"] += 1
                 else:
@@ -10,13 +10,15 @@ Entry points:
 
 from __future__ import annotations
 
+import bisect
 import contextlib
 import json
 import re
 import sqlite3
 from datetime import UTC
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
+from kg.db import write_scope
 from kg.file_indexer import ensure_file_schema
 from kg.reader import FileStore
 
@@ -178,57 +180,110 @@ def _ensure_schema(conn: sqlite3.Connection) -> None:
     ensure_file_schema(conn)
 
 
-def _embed_node(slug: str, node: FileNode, cfg: KGConfig, conn: sqlite3.Connection) -> None:
-    """Embed node text and store in embeddings table + notify vector server."""
-    from datetime import datetime
+def node_embedding(slug: str, node: FileNode, cfg: KGConfig) -> Any | None:
+    """Embed node text (model or remote call, no DB access); None if unavailable or failed.
 
+    Batched writers call this before opening their transaction so the write
+    lock is never held across embedding calls.
+    """
     try:
-        import json as _json
-        import urllib.request as _urllib
-
         from kg.vector_client import embed
     except ImportError:
-        return
+        return None
 
     live = node.live_bullets
     text = node.title + "\n" + "\n".join(b.text for b in live)
     if not text.strip():
-        return
+        return None
 
     try:
         vectors = embed([text], cfg, task_type="doc")
-        if not vectors:
-            return
-        vector = vectors[0]
-        # Store in embeddings table
-        conn.execute(
-            "INSERT OR REPLACE INTO embeddings(node_slug, vector, model, updated_at) VALUES (?, ?, ?, ?)",
-            (slug, vector.tobytes(), cfg.embeddings.model, datetime.now(UTC).isoformat()),
-        )
-        # Notify vector server (non-blocking, best-effort)
-        with contextlib.suppress(Exception):
-            data = _json.dumps({"id": slug, "vector": vector.tolist()}).encode()
-            req = _urllib.Request(
-                f"http://127.0.0.1:{cfg.server.vector_port}/add",
-                data=data,
-                method="POST",
-            )
-            req.add_header("Content-Type", "application/json")
-            _urllib.urlopen(req, timeout=1)  # noqa: S310
     except Exception as exc:
         import sys
         print(f"kg: WARNING: embedding failed for [{slug}]: {exc}", file=sys.stderr, flush=True)
+        return None
+    return vectors[0] if vectors else None
 
 
-def index_node(slug: str, *, nodes_dir: Path, db_path: Path, cfg: KGConfig | None = None) -> None:
-    """Re-index a single node: wipe its rows and re-insert from node.jsonl."""
-    store = FileStore(nodes_dir)
-    node = store.get(slug)
+def _store_embedding(slug: str, vector: Any, cfg: KGConfig, conn: sqlite3.Connection) -> None:
+    from datetime import datetime
 
-    conn = _conn_for(cfg, db_path)
-    _ensure_schema(conn)
+    conn.execute(
+        "INSERT OR REPLACE INTO embeddings(node_slug, vector, model, updated_at) VALUES (?, ?, ?, ?)",
+        (slug, vector.tobytes(), cfg.embeddings.model, datetime.now(UTC).isoformat()),
+    )
 
-    with conn:
+
+def notify_vector_server(slug: str, vector: Any, cfg: KGConfig) -> None:
+    """Push a node's vector to the running vector server (best-effort, 1s timeout)."""
+    import urllib.request as _urllib
+
+    with contextlib.suppress(Exception):
+        data = json.dumps({"id": slug, "vector": vector.tolist()}).encode()
+        req = _urllib.Request(
+            f"http://127.0.0.1:{cfg.server.vector_port}/add",
+            data=data,
+            method="POST",
+        )
+        req.add_header("Content-Type", "application/json")
+        _urllib.urlopen(req, timeout=1)  # noqa: S310
+
+
+def _embed_node(slug: str, node: FileNode, cfg: KGConfig, conn: sqlite3.Connection) -> None:
+    """Embed node text and store in embeddings table + notify vector server."""
+    vector = node_embedding(slug, node, cfg)
+    if vector is None:
+        return
+    try:
+        _store_embedding(slug, vector, cfg, conn)
+    except Exception as exc:
+        import sys
+        print(f"kg: WARNING: embedding failed for [{slug}]: {exc}", file=sys.stderr, flush=True)
+        return
+    notify_vector_server(slug, vector, cfg)
+
+
+# index_node(embedding=...) default: embed inside index_node itself
+_EMBED_INLINE: Any = object()
+
+
+def index_node(
+    slug: str,
+    *,
+    nodes_dir: Path,
+    db_path: Path,
+    cfg: KGConfig | None = None,
+    conn: sqlite3.Connection | None = None,
+    node: FileNode | None = None,
+    embedding: Any = _EMBED_INLINE,
+) -> None:
+    """Re-index a single node: wipe its rows and re-insert from node.jsonl.
+
+    If *conn* is provided it is reused and left open (caller owns schema and
+    commit, e.g. kg.db.batch_writer); otherwise a connection is opened here.
+    *node* may be passed if the caller already parsed it; if None it is read here.
+    *embedding* may be a vector from node_embedding() (or None for none) computed
+    outside the caller's transaction; the caller then notifies the vector server
+    after committing.  By default the node is embedded here.
+    """
+    if node is None:
+        node = FileStore(nodes_dir).get(slug)
+
+    own_conn = conn is None
+    if own_conn:
+        conn = _conn_for(cfg, db_path)
+        _ensure_schema(conn)
+    try:
+        _index_node_rows(slug, node, conn, cfg, embedding)
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def _index_node_rows(
+    slug: str, node: FileNode | None, conn: sqlite3.Connection, cfg: KGConfig | None, embedding: Any = _EMBED_INLINE,
+) -> None:
+    with write_scope(conn):
         # Wipe existing data for this node (CASCADE deletes bullets too)
         conn.execute("DELETE FROM nodes WHERE slug = ?", (slug,))
         conn.execute("DELETE FROM backlinks WHERE from_slug = ?", (slug,))
@@ -273,14 +328,16 @@ def index_node(slug: str, *, nodes_dir: Path, db_path: Path, cfg: KGConfig | Non
                         (slug, doc_slug),
                     )
 
-        # Generate and store embedding if cfg provided
+        # Generate (or take the precomputed) embedding if cfg provided
         if cfg is not None:
-            _embed_node(slug, node, cfg, conn)
+            if embedding is _EMBED_INLINE:
+                _embed_node(slug, node, cfg, conn)
+            elif embedding is not None:
+                _store_embedding(slug, embedding, cfg, conn)
 
     # Increment calibration ops counter (best-effort)
-    with contextlib.suppress(Exception):
+    with contextlib.suppress(Exception), write_scope(conn):
         conn.execute("UPDATE calibration_ops SET ops_count = ops_count + 1 WHERE id = 1")
-        conn.commit()
 
 
 def rebuild_all(nodes_dir: Path, db_path: Path, *, verbose: bool = False, cfg: KGConfig | None = None) -> int:
@@ -402,12 +459,10 @@ def score_to_quantile(score: float, breaks: list[float]) -> float:
     if score >= breaks[-1]:
         return 1.0
     step = 1.0 / (len(breaks) - 1)
-    for i, b in enumerate(breaks):
-        if score < b:
-            lower = breaks[i - 1]
-            frac = (score - lower) / (b - lower) if b > lower else 0.0
-            return (i - 1) * step + frac * step
-    return 1.0
+    i = bisect.bisect_right(breaks, score)  # first break > score; 1 <= i < len
+    b, lower = breaks[i], breaks[i - 1]
+    frac = (score - lower) / (b - lower) if b > lower else 0.0
+    return (i - 1) * step + frac * step
 
 
 def get_calibration(key: str, db_path: Path, cfg: KGConfig | None = None) -> tuple[int, list[float]] | None:
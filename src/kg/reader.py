@@ -32,7 +32,7 @@ if TYPE_CHECKING:
 from kg.models import FileBullet, FileNode, new_bullet_id
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Iterable, Iterator
 
 
 class FileStore:
@@ -107,6 +107,15 @@ class FileStore:
         self._merge_meta(node)
         return node
 
+    def get_many(self, slugs: Iterable[str]) -> dict[str, FileNode]:
+        """Load several nodes at once, each at most once; missing slugs are omitted."""
+        nodes: dict[str, FileNode] = {}
+        for slug in dict.fromkeys(slugs):
+            node = self.get(slug)
+            if node is not None:
+                nodes[slug] = node
+        return nodes
+
     def _merge_meta(self, node: FileNode) -> None:
         """Load meta.json and attach vote counts + node-level budget to node."""
         meta = self._read_meta(node.slug)
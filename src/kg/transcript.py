@@ -6,11 +6,28 @@ Used by the HTTP server and CLI for session-based deduplication.
 from __future__ import annotations
 
 import json
+import mmap
+import os
 import re
-import subprocess
 import sys
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # optional speedup: pip install orjson
+    from json import loads as _json_loads
+
+# Bullet IDs, chunk IDs and [[node-slug]] references (slug captured in group 1).
+# Slug pattern: min 2 chars before hyphen, min 2 chars after.
+# Filters Rich markup [bold], regex classes [a-f0-9], [a-z0-9-], etc.
+_ID_RE = re.compile(
+    rb"bullet-[a-f0-9]{12}|_?chunk-[a-f0-9]{12}|\[\[([a-z_][a-z0-9_]+-[a-z][a-z0-9_-]*[a-z0-9])\]\]"
+)
 
 
 @dataclass
@@ -18,7 +35,8 @@ class TranscriptFingerprint:
     """Content extracted from a transcript for dedup."""
 
     ids: set[str] = field(default_factory=set)  # bullet IDs, chunk IDs, node slugs
-    text: str = ""  # full text blob for substring matching
+    slugs: set[str] = field(default_factory=set)  # [[node-slug]] references only
+    text: bytes | mmap.mmap = b""  # raw UTF-8 transcript bytes for substring matching (.find)
 
 
 def resolve_session_transcript(session_id: str) -> str | None:
@@ -30,67 +48,82 @@ def resolve_session_transcript(session_id: str) -> str | None:
     if not claude_dir.exists():
         return None
 
-    matches: list[Path] = []
-    for project_dir in claude_dir.iterdir():
-        if not project_dir.is_dir():
-            continue
-        for f in project_dir.iterdir():
-            if f.suffix == ".jsonl" and f.stem.startswith(session_id):
-                matches.append(f)
+    # scandir exposes is_dir() from the listing and caches stat() per entry
+    matches: list[tuple[str, float]] = []
+    with os.scandir(claude_dir) as projects:
+        for project_dir in projects:
+            if not project_dir.is_dir():
+                continue
+            with os.scandir(project_dir.path) as entries:
+                for f in entries:
+                    if f.name.endswith(".jsonl") and f.name.startswith(session_id):
+                        matches.append((f.path, f.stat().st_mtime))
 
     if not matches:
         return None
     if len(matches) > 1:
-        matches.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+        matches.sort(key=lambda m: m[1], reverse=True)
         print(
             f"warning: '{session_id}' matches {len(matches)} sessions, using most recent",
             file=sys.stderr,
         )
-    return str(matches[0])
+    return matches[0][0]
 
 
 def fingerprint_transcript(transcript_path: str) -> TranscriptFingerprint:
-    """Extract IDs and full text from a Claude Code transcript.
+    """Extract IDs and raw bytes from a Claude Code transcript.
 
     IDs: bullet-xxx, _chunk-xxx, [node-slug] references.
-    Text: all text content concatenated for substring matching.
+    Text: the transcript mapped read-only for substring matching (``.find`` a
+    ``str.encode()``); the mapping outlives the file handle, and nothing is copied.
     """
     path = Path(transcript_path)
     if not path.exists():
         return TranscriptFingerprint()
 
-    # Load full text (needed for substring dedup)
-    text = path.read_text(errors="replace")
-
-    # Extract IDs — try rg first (fast), fall back to regex
-    # Slug pattern: min 2 chars before hyphen, min 2 chars after.
-    # Filters Rich markup [bold], regex classes [a-f0-9], [a-z0-9-], etc.
-    _slug_re = r"\[\[([a-z_][a-z0-9_]+-[a-z][a-z0-9_-]*[a-z0-9])\]\]"
+    # Scan the mapped file as bytes — the ID patterns are ASCII, so only the
+    # matches need decoding, never the whole transcript.
     ids: set[str] = set()
-    try:
-        result = subprocess.run(
-            [
-                "rg",
-                "-o",
-                r"bullet-[a-f0-9]{12}|_?chunk-[a-f0-9]{12}|" + _slug_re,
-                str(path),
-            ],
-            capture_output=True,
-            text=True,
-            timeout=3,
-            check=False,
-        )
-        for line in result.stdout.splitlines():
-            line = line.strip().strip("[]")
-            if line:
-                ids.add(line)
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        # Fallback: Python regex
-        ids.update(re.findall(r"bullet-[a-f0-9]{12}", text))
-        ids.update(re.findall(r"_?chunk-[a-f0-9]{12}", text))
-        ids.update(re.findall(_slug_re, text))
-
-    return TranscriptFingerprint(ids=ids, text=text)
+    slugs: set[str] = set()
+    with path.open("rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file cannot be mapped
+            return TranscriptFingerprint()
+    for m in _ID_RE.finditer(mm):
+        slug = m.group(1)
+        if slug:
+            slugs.add(slug.decode("ascii"))
+        else:
+            ids.add(m.group(0).decode("ascii"))
+    ids |= slugs
+
+    # The mapping itself serves substring dedup: page cache, not a heap copy
+    return TranscriptFingerprint(ids=ids, slugs=slugs, text=mm)
+
+
+def _iter_lines_reversed(path: Path, block_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield the lines of a file last-to-first, reading backwards in blocks."""
+    with path.open("rb") as f:
+        pos = f.seek(0, 2)
+        # Pieces of the line that straddles the blocks read so far, last piece
+        # first; joined once its start turns up, so a multi-MB line is not
+        # re-copied for every block
+        pending: list[bytes] = []
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            if b"\n" not in block:
+                pending.append(block)
+                continue
+            lines = block.split(b"\n")
+            pending.append(lines.pop())
+            yield b"".join(reversed(pending))
+            pending = [lines.pop(0)]  # may be incomplete — carry into next block
+            yield from reversed(lines)
+        yield b"".join(reversed(pending))
 
 
 def extract_last_user_prompt(transcript_path: str) -> str:
@@ -102,39 +135,46 @@ def extract_last_user_prompt(transcript_path: str) -> str:
     if not path.exists():
         return ""
 
-    # Read lines in reverse to find last user message with text
+    # Scan lines from EOF — the last user message is usually near the tail
     try:
-        lines = path.read_text(errors="replace").splitlines()
+        for raw in _iter_lines_reversed(path):
+            if b'"user"' not in raw:
+                continue
+            text = _user_text(raw)
+            if text:
+                return text
     except OSError:
         return ""
 
-    for line in reversed(lines):
-        if not line.strip():
-            continue
-        try:
-            obj = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-
-        if obj.get("type") != "user":
-            continue
-
-        msg = obj.get("message")
-        if not msg:
-            continue
-
-        content = msg.get("content", "")
-
-        # String content — direct user text
-        if isinstance(content, str) and content.strip():
-            return content.strip()
-
-        # List content — look for text blocks (skip tool_result-only)
-        if isinstance(content, list):
-            for block in content:
-                if isinstance(block, dict) and block.get("type") == "text":
-                    text = block.get("text", "")
-                    if text.strip():
-                        return text.strip()
+    return ""
+
+
+def _user_text(raw: bytes) -> str:
+    """Return the user-authored text of one transcript line, or empty string."""
+    try:
+        obj = _json_loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return ""
+
+    if not isinstance(obj, dict) or obj.get("type") != "user":
+        return ""
+
+    msg = obj.get("message")
+    if not msg:
+        return ""
+
+    content = msg.get("content", "")
+
+    # String content — direct user text
+    if isinstance(content, str) and content.strip():
+        return content.strip()
+
+    # List content — look for text blocks (skip tool_result-only)
+    if isinstance(content, list):
+        for block in content:
+            if isinstance(block, dict) and block.get("type") == "text":
+                text = block.get("text", "")
+                if text.strip():
+                    return text.strip()
 
     return ""
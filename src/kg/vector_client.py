@@ -2,21 +2,31 @@
 
 from __future__ import annotations
 
+import base64
+import http.client
 import json
-import sqlite3
+import threading
 import urllib.error
-import urllib.request
+import urllib.parse
 from typing import TYPE_CHECKING, Any
 
-if TYPE_CHECKING:
-    from pathlib import Path
+import numpy as np
+
+from kg.embedder import EmbeddingMemo, get_embedder
 
-    import numpy as np
+if TYPE_CHECKING:
     from numpy.typing import NDArray
 
     from kg.config import KGConfig
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # optional speedup: pip install orjson
+    from json import loads as _json_loads
+
 _TIMEOUT = 5  # seconds for all network calls
+_memo = EmbeddingMemo(maxsize=1_000)  # per-process: repeated texts skip the HTTP round-trip
+_local = threading.local()  # per-thread keep-alive connections, keyed by host:port
 
 
 # ---------------------------------------------------------------------------
@@ -29,37 +39,66 @@ def server_url(cfg: KGConfig) -> str:  # pyright: ignore[reportUndefinedVariable
     return f"http://127.0.0.1:{cfg.server.vector_port}"
 
 
+def _send(conn: http.client.HTTPConnection, method: str, path: str, data: bytes | None) -> tuple[int, bytes]:
+    headers = {"Content-Type": "application/json"} if data is not None else {}
+    conn.request(method, path, body=data, headers=headers)
+    resp = conn.getresponse()
+    return resp.status, resp.read()
+
+
+def _request(method: str, url: str, data: bytes | None = None) -> tuple[int, bytes]:
+    """Send one request on this thread's keep-alive connection to url's host.
+
+    Connections are reused across calls; a connection the server has since
+    closed is replaced once transparently.
+    """
+    parts = urllib.parse.urlsplit(url)
+    conns: dict[str, http.client.HTTPConnection] = _local.__dict__.setdefault("conns", {})
+    conn = conns.pop(parts.netloc, None)
+    if conn is not None:
+        try:
+            result = _send(conn, method, parts.path, data)
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()  # idle connection dropped by the server — retry on a fresh one
+        except Exception:
+            conn.close()
+            raise
+        else:
+            conns[parts.netloc] = conn
+            return result
+    conn = http.client.HTTPConnection(parts.hostname or "127.0.0.1", parts.port, timeout=_TIMEOUT)
+    try:
+        result = _send(conn, method, parts.path, data)
+    except Exception:
+        conn.close()
+        raise
+    conns[parts.netloc] = conn
+    return result
+
+
 def _post(url: str, body: dict[str, Any]) -> dict[str, Any] | None:
     """POST JSON to url; returns None on connection errors, raises on others."""
     data = json.dumps(body).encode()
-    req = urllib.request.Request(  # noqa: S310
-        url,
-        data=data,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
     try:
-        with urllib.request.urlopen(req, timeout=_TIMEOUT) as resp:  # noqa: S310
-            return json.loads(resp.read())  # type: ignore[no-any-return]
-    except (ConnectionRefusedError, urllib.error.URLError) as exc:
+        status, payload = _request("POST", url, data)
+    except OSError as exc:
         # Treat connection-refused and timeout as "server not available"
-        cause = exc.reason if isinstance(exc, urllib.error.URLError) else exc
-        if isinstance(cause, (ConnectionRefusedError, TimeoutError)):
+        if isinstance(exc, (ConnectionRefusedError, TimeoutError)):
             return None
-        # URLError wrapping an OSError with errno ECONNREFUSED
-        if isinstance(cause, OSError) and getattr(cause, "errno", None) in (111, 61):
+        # OSError with errno ECONNREFUSED
+        if exc.errno in (111, 61):
             return None
         raise
+    if status >= 400:
+        raise urllib.error.HTTPError(url, status, payload.decode(errors="replace"), None, None)  # type: ignore[arg-type]
+    return _json_loads(payload)  # type: ignore[no-any-return]
 
 
 def is_server_running(cfg: KGConfig) -> bool:  # pyright: ignore[reportUndefinedVariable]
     """Return True if the vector server is reachable."""
-    url = server_url(cfg) + "/health"
-    req = urllib.request.Request(url, method="GET")  # noqa: S310
     try:
-        with urllib.request.urlopen(req, timeout=_TIMEOUT) as resp:  # noqa: S310
-            data = json.loads(resp.read())
-            return data.get("status") == "ok"
+        status, payload = _request("GET", server_url(cfg) + "/health")
+        return status == 200 and _json_loads(payload).get("status") == "ok"
     except Exception:
         return False
 
@@ -75,17 +114,23 @@ def embed(
     *,
     context: str = "",
     task_type: str = "doc",
-) -> list[NDArray[np.float32]]:  # pyright: ignore[reportUndefinedVariable]
+) -> list[NDArray[np.float32]]:
     """Embed texts via server (fast) or local embedder (fallback).
 
-    Returns a list of numpy arrays, one per input text.
+    Returns a list of numpy arrays, one per input text. Repeated texts are
+    served from an in-process memo without contacting the server.
     """
-    try:
-        import numpy as np
-    except ImportError as e:
-        msg = "numpy is required: pip install numpy"
-        raise ImportError(msg) from e
+    return _memo.embed(
+        texts, context, task_type, lambda miss: _embed_uncached(miss, cfg, context, task_type)
+    )
+
 
+def _embed_uncached(
+    texts: list[str],
+    cfg: KGConfig,  # pyright: ignore[reportUndefinedVariable]
+    context: str,
+    task_type: str,
+) -> list[NDArray[np.float32]]:
     # Try server first
     result = _post(
         server_url(cfg) + "/embed",
@@ -95,8 +140,6 @@ def embed(
         return [np.array(v, dtype=np.float32) for v in result["vectors"]]
 
     # Fallback: direct computation
-    from kg.embedder import get_embedder
-
     cache_dir = cfg.index_dir / "embedding_cache"
     embedder = get_embedder(cfg.embeddings.model, cache_dir)
     if task_type == "query":
@@ -110,44 +153,6 @@ def embed(
 # ---------------------------------------------------------------------------
 
 
-def _load_all_vectors_from_db(db_path: Path) -> tuple[list[str], NDArray[np.float32]] | tuple[list[str], None]:  # pyright: ignore[reportUndefinedVariable]
-    """Load all embeddings from SQLite for local fallback search."""
-    try:
-        import numpy as np
-    except ImportError as e:
-        msg = "numpy is required: pip install numpy"
-        raise ImportError(msg) from e
-
-    if not db_path.exists():
-        return [], None
-
-    conn = sqlite3.connect(str(db_path))
-    try:
-        rows = conn.execute(
-            "SELECT node_slug, vector FROM embeddings WHERE vector IS NOT NULL"
-        ).fetchall()
-    except sqlite3.OperationalError:
-        return [], None
-    finally:
-        conn.close()
-
-    if not rows:
-        return [], None
-
-    ids: list[str] = []
-    vecs: list[NDArray[np.float32]] = []  # pyright: ignore[reportUndefinedVariable]
-    for slug, blob in rows:
-        if blob is None:
-            continue
-        ids.append(slug)
-        vecs.append(np.frombuffer(blob, dtype=np.float32))
-
-    if not ids:
-        return [], None
-
-    return ids, np.array(vecs, dtype=np.float32)
-
-
 def search_vector(
     query_text: str,
     cfg: KGConfig,  # pyright: ignore[reportUndefinedVariable]
@@ -158,39 +163,32 @@ def search_vector(
 
     Returns list of (node_slug, score) tuples sorted by score descending.
     """
-    try:
-        import numpy as np
-    except ImportError as e:
-        msg = "numpy is required: pip install numpy"
-        raise ImportError(msg) from e
-
     # Embed the query (tries server first, falls back to local)
     query_vec = embed([query_text], cfg, task_type="query")[0]
 
-    # Try server search
+    # Try server search — send the unit query as raw float32 bytes, not JSON floats
+    q = _unit_vector(query_vec)
     result = _post(
         server_url(cfg) + "/search",
-        {"vector": query_vec.tolist(), "k": k},
+        {"vector_b64": base64.b64encode(q.tobytes()).decode(), "k": k, "normalized": True},
     )
     if result is not None:
         return [(r["id"], float(r["score"])) for r in result["results"]]
 
-    # Fallback: local numpy cosine similarity
-    ids, matrix = _load_all_vectors_from_db(cfg.db_path)
+    # Fallback: local cosine similarity over the stored embeddings
+    from kg.vector_server import VectorIndex, load_index_from_db
+
+    ids, matrix = load_index_from_db(cfg.db_path)
     if not ids or matrix is None:
         return []
 
-    q = query_vec.astype(np.float32)
-    q_norm = np.linalg.norm(q)
-    if q_norm > 0:
-        q = q / q_norm
+    index = VectorIndex()
+    index.add_batch(ids, matrix)
+    return index.search(q, k=k, normalized=True)
 
-    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
-    norms = np.where(norms == 0, 1.0, norms)
-    normed = matrix / norms
-    scores: NDArray[np.float32] = (normed @ q).astype(np.float32)  # pyright: ignore[reportUndefinedVariable]
 
-    top_k = min(k, len(ids))
-    top_indices = np.argpartition(scores, -top_k)[-top_k:]
-    top_indices = top_indices[np.argsort(scores[top_indices])[::-1]]
-    return [(ids[int(i)], float(scores[int(i)])) for i in top_indices]
+def _unit_vector(vec: NDArray[np.float32]) -> NDArray[np.float32]:
+    """Return vec as contiguous float32 scaled to unit L2 norm (zero stays zero)."""
+    q = np.ascontiguousarray(vec, dtype=np.float32)
+    norm = float(np.linalg.norm(q))
+    return q / norm if norm > 0 else q
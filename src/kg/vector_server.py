@@ -1,15 +1,17 @@
-"""Vector server: keeps embedding model + in-memory numpy index warm.
+"""Vector server: keeps embedding model + in-memory vector index warm.
 
 Started by supervisord alongside the watcher. Provides:
   GET  /health              → {"status": "ok", "n_vectors": N}
   POST /embed               → {"vectors": [[float, ...]]}
   POST /search              → {"results": [{"id": str, "score": float}]}
+                              (body: "vector" list or "vector_b64" raw float32)
   POST /add                 → {"ok": true}
   POST /add_batch           → {"ok": true, "n": N}
 """
 
 from __future__ import annotations
 
+import base64
 import json
 import sqlite3
 import sys
@@ -17,14 +19,25 @@ import threading
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import TYPE_CHECKING, Any
 
-from kg.embedder import CachedEmbedder, get_embedder
+import numpy as np
+
+from kg.embedder import CachedEmbedder, EmbeddingMemo, get_embedder
 
 if TYPE_CHECKING:
     from pathlib import Path
 
-    import numpy as np
     from numpy.typing import NDArray
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # optional speedup: pip install orjson
+    from json import loads as _json_loads
+
+try:
+    import faiss  # type: ignore[import-not-found]
+except ImportError:  # optional speedup: pip install faiss-cpu
+    faiss = None
+
 
 # ---------------------------------------------------------------------------
 # Module-level singletons (set by run_vector_server before serving)
@@ -32,6 +45,7 @@ if TYPE_CHECKING:
 
 _embedder: CachedEmbedder | None = None
 _index: VectorIndex | None = None
+_memo = EmbeddingMemo()  # identical /embed requests skip the model entirely
 
 
 # ---------------------------------------------------------------------------
@@ -40,11 +54,17 @@ _index: VectorIndex | None = None
 
 
 class VectorIndex:
-    """Thread-safe in-memory vector index using numpy cosine similarity."""
+    """Thread-safe in-memory vector index using cosine similarity.
+
+    Rows are L2-normalised on insert, so search is a plain inner product.
+    Uses a FAISS ``IndexFlatIP`` for top-k when faiss is installed, otherwise
+    a numpy matmul + argpartition.
+    """
 
     def __init__(self) -> None:
         self.ids: list[str] = []
-        self.matrix: NDArray[np.float32] | None = None  # pyright: ignore[reportUndefinedVariable]
+        self.matrix: NDArray[np.float32] | None = None  # unit rows
+        self._faiss: Any = None  # faiss.IndexFlatIP mirroring matrix; None = rebuild on search
         self._lock = threading.Lock()
 
     @property
@@ -53,47 +73,41 @@ class VectorIndex:
         with self._lock:
             return len(self.ids)
 
-    def add(self, node_id: str, vector: NDArray[np.float32]) -> None:  # pyright: ignore[reportUndefinedVariable]
+    def add(self, node_id: str, vector: NDArray[np.float32]) -> None:
         """Add a single vector (thread-safe)."""
-        try:
-            import numpy as np
-        except ImportError as e:
-            msg = "numpy is required: pip install numpy"
-            raise ImportError(msg) from e
+        vec = _normalize_rows(vector.reshape(1, -1).astype(np.float32))
         with self._lock:
             if node_id in self.ids:
                 # Update existing
                 idx = self.ids.index(node_id)
                 if self.matrix is not None:
-                    self.matrix[idx] = vector
+                    self.matrix[idx] = vec[0]
+                self._faiss = None  # flat index can't update in place
             else:
                 self.ids.append(node_id)
-                vec = vector.reshape(1, -1).astype(np.float32)
                 if self.matrix is None:
                     self.matrix = vec
                 else:
                     self.matrix = np.vstack([self.matrix, vec])
+                if self._faiss is not None:
+                    self._faiss.add(vec)
 
-    def add_batch(self, ids: list[str], vectors: list[NDArray[np.float32]]) -> None:  # pyright: ignore[reportUndefinedVariable]
-        """Bulk-load vectors (thread-safe). Replaces any existing ids."""
-        try:
-            import numpy as np
-        except ImportError as e:
-            msg = "numpy is required: pip install numpy"
-            raise ImportError(msg) from e
+    def add_batch(self, ids: list[str], matrix: NDArray[np.float32]) -> None:
+        """Bulk-load an (N, D) matrix (thread-safe). Replaces any existing ids.
+
+        A contiguous float32 matrix is taken over and normalised in place
+        rather than copied.
+        """
         if not ids:
             return
+        matrix = _normalize_rows(np.ascontiguousarray(matrix, dtype=np.float32), inplace=True)
         with self._lock:
             self.ids = list(ids)
-            self.matrix = np.array(vectors, dtype=np.float32)
+            self.matrix = matrix
+            self._faiss = None
 
     def remove(self, node_id: str) -> None:
         """Remove a vector by id (thread-safe)."""
-        try:
-            import numpy as np
-        except ImportError as e:
-            msg = "numpy is required: pip install numpy"
-            raise ImportError(msg) from e
         with self._lock:
             if node_id not in self.ids:
                 return
@@ -102,40 +116,67 @@ class VectorIndex:
             if self.matrix is not None:
                 new_matrix = np.delete(self.matrix, idx, axis=0)
                 self.matrix = None if new_matrix.shape[0] == 0 else new_matrix
-
-    def search(self, query_vector: NDArray[np.float32], k: int = 20) -> list[tuple[str, float]]:  # pyright: ignore[reportUndefinedVariable]
-        """Cosine similarity search; returns top-k (id, score) sorted desc."""
-        try:
-            import numpy as np
-        except ImportError as e:
-            msg = "numpy is required: pip install numpy"
-            raise ImportError(msg) from e
+            self._faiss = None
+
+    def search(
+        self,
+        query_vector: NDArray[np.float32],
+        k: int = 20,
+        *,
+        normalized: bool = False,
+    ) -> list[tuple[str, float]]:
+        """Cosine similarity search; returns top-k (id, score) sorted desc.
+
+        Pass normalized=True when query_vector is already unit-length float32.
+        """
+        q = query_vector
+        if not normalized:
+            q = _normalize_rows(q.reshape(1, -1))[0]
         with self._lock:
             if self.matrix is None or len(self.ids) == 0:
                 return []
-            # Normalise query
-            q = query_vector.astype(np.float32)
-            q_norm = np.linalg.norm(q)
-            if q_norm > 0:
-                q = q / q_norm
-            # Normalise matrix rows
-            norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
-            norms = np.where(norms == 0, 1.0, norms)
-            normed = self.matrix / norms
-            scores: NDArray[np.float32] = (normed @ q).astype(np.float32)
             top_k = min(k, len(self.ids))
-            top_indices = np.argpartition(scores, -top_k)[-top_k:]
-            top_indices = top_indices[np.argsort(scores[top_indices])[::-1]]
+            if faiss is not None:
+                if self._faiss is None:
+                    self._faiss = faiss.IndexFlatIP(self.matrix.shape[1])
+                    self._faiss.add(self.matrix)
+                dists, idxs = self._faiss.search(q.reshape(1, -1), top_k)
+                return [(self.ids[int(i)], float(s)) for s, i in zip(dists[0], idxs[0], strict=True)]
+            scores: NDArray[np.float32] = self.matrix @ q
+            if top_k < len(scores):
+                # Partition once over N, then order only the k survivors
+                top_indices = np.argpartition(scores, -top_k)[-top_k:]
+                top_indices = top_indices[np.argsort(-scores[top_indices])]
+            else:
+                top_indices = np.argsort(-scores)
             return [(self.ids[int(i)], float(scores[int(i)])) for i in top_indices]
 
 
+def _normalize_rows(matrix: NDArray[np.float32], *, inplace: bool = False) -> NDArray[np.float32]:
+    """Scale each row to unit L2 norm; zero rows are left as-is."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    if inplace and matrix.dtype == np.float32 and matrix.flags.c_contiguous and matrix.flags.writeable:
+        matrix /= norms
+        return matrix
+    return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+
 # ---------------------------------------------------------------------------
 # HTTP handler
 # ---------------------------------------------------------------------------
 
 
 class KGVectorHandler(BaseHTTPRequestHandler):
-    """HTTP request handler for the vector server."""
+    """HTTP request handler for the vector server.
+
+    Speaks HTTP/1.1 so clients can keep one connection open across /embed and
+    /search calls; every response carries Content-Length. Idle keep-alive
+    connections are dropped after ``timeout`` seconds to free their thread.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = 30
 
     def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
         """Suppress default access log output."""
@@ -156,7 +197,7 @@ class KGVectorHandler(BaseHTTPRequestHandler):
         if length == 0:
             return {}
         try:
-            return json.loads(self.rfile.read(length))  # type: ignore[no-any-return]
+            return _json_loads(self.rfile.read(length))  # type: ignore[no-any-return]
         except (json.JSONDecodeError, ValueError):
             return None
 
@@ -203,28 +244,38 @@ class KGVectorHandler(BaseHTTPRequestHandler):
             self._send_error(503, "embedder not initialised")
             return
         try:
+            embedder = _embedder
             if task_type == "query":
-                vectors = [_embedder.embed_query(t) for t in texts]
+                def compute(miss: list[str]) -> list[NDArray[np.float32]]:
+                    return [embedder.embed_query(t) for t in miss]
             else:
-                contexts = [context] * len(texts)
-                vectors = _embedder.embed_batch(texts, contexts)
+                def compute(miss: list[str]) -> list[NDArray[np.float32]]:
+                    return embedder.embed_batch(miss, [context] * len(miss))
+            vectors = _memo.embed(texts, context, task_type, compute)
             self._send_json({"vectors": [v.tolist() for v in vectors]})
         except Exception as exc:
             self._send_error(500, str(exc))
 
     def _handle_search(self, body: dict[str, Any]) -> None:
         raw_vector = body.get("vector")
+        raw_b64 = body.get("vector_b64")
         k: int = int(body.get("k", 20))
-        if raw_vector is None or not isinstance(raw_vector, list):
+        if raw_b64 is not None:
+            if not isinstance(raw_b64, str):
+                self._send_error(400, "vector_b64 must be a base64 string")
+                return
+        elif raw_vector is None or not isinstance(raw_vector, list):
             self._send_error(400, "vector must be a list of floats")
             return
         if _index is None:
             self._send_error(503, "index not initialised")
             return
         try:
-            import numpy as np
-            query_vec = np.array(raw_vector, dtype=np.float32)
-            results = _index.search(query_vec, k=k)
+            if raw_b64 is not None:
+                query_vec = np.frombuffer(base64.b64decode(raw_b64), dtype=np.float32)
+            else:
+                query_vec = np.array(raw_vector, dtype=np.float32)
+            results = _index.search(query_vec, k=k, normalized=bool(body.get("normalized")))
             self._send_json({"results": [{"id": id_, "score": score} for id_, score in results]})
         except Exception as exc:
             self._send_error(500, str(exc))
@@ -242,7 +293,6 @@ class KGVectorHandler(BaseHTTPRequestHandler):
             self._send_error(503, "index not initialised")
             return
         try:
-            import numpy as np
             _index.add(id_, np.array(raw_vector, dtype=np.float32))
             self._send_json({"ok": True})
         except Exception as exc:
@@ -260,10 +310,15 @@ class KGVectorHandler(BaseHTTPRequestHandler):
         if _index is None:
             self._send_error(503, "index not initialised")
             return
+        if not ids:
+            self._send_json({"ok": True, "n": 0})
+            return
         try:
-            import numpy as np
-            vecs = [np.array(v, dtype=np.float32) for v in raw_vectors]
-            _index.add_batch(ids, vecs)
+            # Fill one (N, D) buffer directly — no per-row arrays, no second copy
+            buf = np.empty((len(raw_vectors), len(raw_vectors[0])), dtype=np.float32)
+            for i, row in enumerate(raw_vectors):
+                buf[i] = row
+            _index.add_batch(ids, buf)
             self._send_json({"ok": True, "n": len(ids)})
         except Exception as exc:
             self._send_error(500, str(exc))
@@ -274,16 +329,11 @@ class KGVectorHandler(BaseHTTPRequestHandler):
 # ---------------------------------------------------------------------------
 
 
-def load_index_from_db(db_path: Path) -> tuple[list[str], NDArray[np.float32]] | tuple[list[str], None]:  # pyright: ignore[reportUndefinedVariable]
+def load_index_from_db(db_path: Path) -> tuple[list[str], NDArray[np.float32]] | tuple[list[str], None]:
     """Load existing embeddings from the SQLite graph.db.
 
     Returns (ids, matrix) where matrix is (N, D) float32, or ([], None) if empty.
     """
-    try:
-        import numpy as np
-    except ImportError as e:
-        msg = "numpy is required: pip install numpy"
-        raise ImportError(msg) from e
 
     if not db_path.exists():
         return [], None
@@ -302,19 +352,17 @@ def load_index_from_db(db_path: Path) -> tuple[list[str], NDArray[np.float32]] |
     if not rows:
         return [], None
 
-    ids: list[str] = []
-    vecs: list[NDArray[np.float32]] = []  # pyright: ignore[reportUndefinedVariable]
-    for slug, blob in rows:
-        if blob is None:
-            continue
-        ids.append(slug)
-        vecs.append(np.frombuffer(blob, dtype=np.float32))
-
-    if not ids:
+    rows = [(slug, blob) for slug, blob in rows if blob is not None]
+    if not rows:
         return [], None
 
-    matrix: NDArray[np.float32] = np.array(vecs, dtype=np.float32)  # pyright: ignore[reportUndefinedVariable]
-    return ids, matrix
+    # Copy each blob straight into one writable (N, D) buffer that
+    # VectorIndex.add_batch can adopt without another copy.
+    dim = len(rows[0][1]) // 4
+    matrix: NDArray[np.float32] = np.empty((len(rows), dim), dtype=np.float32)
+    for i, (_, blob) in enumerate(rows):
+        matrix[i] = np.frombuffer(blob, dtype=np.float32)
+    return [slug for slug, _ in rows], matrix
 
 
 # ---------------------------------------------------------------------------
@@ -353,7 +401,7 @@ def run_vector_server(cfg: KGConfig) -> None:  # pyright: ignore[reportUndefined
     _index = VectorIndex()
     ids, matrix = load_index_from_db(cfg.db_path)
     if ids and matrix is not None:
-        _index.add_batch(ids, [matrix[i] for i in range(len(ids))])
+        _index.add_batch(ids, matrix)
 
     host = "127.0.0.1"
     port = cfg.server.vector_port
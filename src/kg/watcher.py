@@ -9,6 +9,10 @@ On IN_CLOSE_WRITE for node.jsonl or meta.jsonl:
 On IN_CLOSE_WRITE for any source file:
     - Re-indexes that file (content-hash checked inside index_file)
 
+Indexing runs on one background writer thread. It collects queued jobs for
+_DEBOUNCE_MS after the first one (up to _BATCH_MAX), so a burst of saves is
+re-indexed once per distinct node/file inside a single SQLite transaction.
+
 Also runs a periodic poll of source dirs every `poll_interval` seconds
 as a safety net for missed inotify events.
 
@@ -17,25 +21,50 @@ Falls back to pure polling if inotify is unavailable (macOS, Docker).
 
 from __future__ import annotations
 
+import contextlib
+import hashlib
+import itertools
+import json
 import logging
+import mmap
+import multiprocessing
+import os
+import queue
+import select
+import selectors
+import sqlite3
 import sys
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from kg.config import load_config
+from kg.db import batch_writer, cfg_from_path, tune_writer
 from kg.file_indexer import index_file
 from kg.file_indexer import index_source as _poll_index_source
-from kg.indexer import index_node
+from kg.indexer import index_node, node_embedding, notify_vector_server
+from kg.reader import FileStore
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     from kg.config import KGConfig
+    from kg.models import FileNode
 
 logger = logging.getLogger("kg.watcher")
 
 _POLL_INTERVAL = 30.0      # seconds between periodic full-source polls
-_INOTIFY_TIMEOUT_MS = 5000
+_INOTIFY_TIMEOUT_MS = 5000  # upper bound on an idle wait
+_INOTIFY_MAX_QUEUED_EVENTS = 65536  # fs.inotify.max_queued_events suggested on overflow
+_DEBOUNCE_MS = 200         # worker keeps collecting jobs this long after the first one
+_BATCH_MAX = 500           # jobs per transaction (bounds how long the write lock is held)
+_WRITE_ATTEMPTS = 3        # times a job is tried in a failing batch before it is dropped
+_PARALLEL_STARTUP_MIN = 256   # nodes before startup parsing moves to a process pool
 _CALIBRATE_INTERVAL = 300.0   # seconds between auto-calibration checks
+_POLL_BACKOFF = 1.5        # poll mode: pace multiplier per pass without changes
+_POLL_IDLE_MAX_S = 10.0    # poll mode: slowest pace while idle
 
 # ---------------------------------------------------------------------------
 # SIGHUP config reload
@@ -44,19 +73,34 @@ _CALIBRATE_INTERVAL = 300.0   # seconds between auto-calibration checks
 # Mutable containers so signal handlers and loop can share state without globals.
 _reload_state: list[bool] = [False]     # [0] = SIGHUP reload requested
 _calibrate_now: list[bool] = [False]    # [0] = SIGUSR1 calibrate requested
+_wake_fd: list[int] = [-1]              # [0] = fd the running watch loop waits on
+_WAKE_BYTES = (1).to_bytes(8, sys.byteorder)
 
 
 class _ReloadRequestedError(Exception):
     """Raised from within a watcher loop to trigger a config reload."""
 
 
+def _wake_loop() -> None:
+    """Interrupt the watch loop's wait so it notices a flag set by a signal.
+
+    _wake_fd is an eventfd (inotify loop) or a pipe's write end (poll loop);
+    an 8-byte count of 1 is a valid write to either.
+    """
+    if _wake_fd[0] >= 0:
+        with contextlib.suppress(OSError):
+            os.write(_wake_fd[0], _WAKE_BYTES)
+
+
 def _handle_sighup(signum: int, frame: object) -> None:  # noqa: ARG001
     _reload_state[0] = True
+    _wake_loop()
     logger.info("SIGHUP received — config reload requested")
 
 
 def _handle_sigusr1(signum: int, frame: object) -> None:  # noqa: ARG001
     _calibrate_now[0] = True
+    _wake_loop()
     logger.info("SIGUSR1 received — immediate calibration requested")
 
 
@@ -64,29 +108,308 @@ def _handle_sigusr1(signum: int, frame: object) -> None:  # noqa: ARG001
 # Handlers
 # ---------------------------------------------------------------------------
 
-def _index_node(slug: str, nodes_dir: Path, db_path: Path, cfg: KGConfig | None = None) -> None:
+def _index_node(
+    slug: str,
+    nodes_dir: Path,
+    db_path: Path,
+    cfg: KGConfig | None = None,
+    conn: sqlite3.Connection | None = None,
+    node: FileNode | None = None,
+    *,
+    embedding: Any,
+) -> bool:
+    """Index one node with its precomputed embedding; returns False (after logging) if it failed."""
     try:
-        index_node(slug, nodes_dir=nodes_dir, db_path=db_path, cfg=cfg)
+        index_node(slug, nodes_dir=nodes_dir, db_path=db_path, cfg=cfg, conn=conn, node=node, embedding=embedding)
         logger.info("node indexed: %s", slug)
     except Exception:
         logger.exception("failed to index node: %s", slug)
+        return False
+    return True
+
+
+def _node_embeddings(nodes: Iterable[tuple[str, FileNode | None]], cfg: KGConfig | None) -> dict[str, Any]:
+    """Embedding per parsed node (None where there is none), computed before any write lock is taken."""
+    if cfg is None:
+        return {}
+    return {slug: node_embedding(slug, node, cfg) if node is not None else None for slug, node in nodes}
 
 
-def _index_source_file(path: Path, source_root: Path, source_name: str, db_path: Path, max_size_kb: int) -> None:
+def _push_embeddings(vectors: dict[str, Any], committed: Iterable[str], cfg: KGConfig | None) -> None:
+    """Send the committed nodes' vectors to the vector server, after their transaction."""
+    if cfg is None:
+        return
+    for slug in committed:
+        vector = vectors.get(slug)
+        if vector is not None:
+            notify_vector_server(slug, vector, cfg)
+
+
+def _index_source_file(
+    path: Path,
+    source_root: Path,
+    source_name: str,
+    db_path: Path,
+    max_size_kb: int,
+    conn: sqlite3.Connection | None = None,
+) -> bool:
+    """Index one source file; returns False (after logging) if it failed."""
+    # String prefix instead of Path.relative_to: no PurePath built per event
+    root, abs_path = str(source_root).rstrip(os.sep) + os.sep, str(path)
+    if not abs_path.startswith(root):
+        logger.warning("file outside its source root, not indexed: %s", path)
+        return False
+    rel = abs_path[len(root):]
     try:
-        rel = str(path.relative_to(source_root))
-        index_file(path, rel_path=rel, source_name=source_name, db_path=db_path, max_size_kb=max_size_kb)
+        index_file(
+            path, rel_path=rel, source_name=source_name, db_path=db_path,
+            max_size_kb=max_size_kb, conn=conn,
+        )
         logger.info("file indexed: %s", rel)
     except Exception:
         logger.exception("failed to index file: %s", path)
+        return False
+    return True
 
 
-def _slug_from_path(nodes_dir: Path, changed: Path) -> str | None:
+def _node_dirs(nodes_dir: Path) -> list[Path]:
+    """Subdirectories of nodes_dir, typed from the cached dirent (no stat per entry)."""
+    with os.scandir(nodes_dir) as it:
+        return [Path(e.path) for e in it if e.is_dir()]
+
+
+def _file_job(path: Path | str, meta: dict) -> tuple:
+    """Worker job for a changed source file; meta is the watched source dict."""
+    return ("file", str(path), str(meta["path"]), meta.get("name", ""), meta.get("max_size_kb", 512))
+
+
+# ---------------------------------------------------------------------------
+# Index worker
+# ---------------------------------------------------------------------------
+
+_WORK_QUEUE_MAX = 10_000
+
+
+def _stat_sig(path: str) -> tuple[int, int, int] | None:
+    """(st_ino, st_mtime_ns, st_size) of path, or None if it cannot be stat'ed."""
     try:
-        rel = changed.relative_to(nodes_dir)
-        return rel.parts[0]
-    except (ValueError, IndexError):
+        st = os.stat(path)  # noqa: PTH116  (str path per event; no Path built)
+    except OSError:
         return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _file_digest(path: str) -> str | None:
+    """BLAKE2b-128 hex digest of the file, hashed through a read-only mmap."""
+    try:
+        with Path(path).open("rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return hashlib.blake2b(b"", digest_size=16).hexdigest()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return hashlib.blake2b(m, digest_size=16).hexdigest()
+    except (OSError, ValueError):
+        return None
+
+
+def _stat_cache_path(db_path: Path) -> Path:
+    # graph.db.stat-cache.json: cleared along with graph.db* on a DB reset
+    return db_path.with_name(db_path.name + ".stat-cache.json")
+
+
+def _load_stat_cache(db_path: Path) -> dict[str, tuple]:
+    """(ino, mtime_ns, size, digest) per path saved by the previous run ({} if unreadable).
+
+    The startup source pass trusts an entry only for a file that file_sources
+    already holds (see index_source), so a rebuilt DB is still fully re-indexed.
+    """
+    try:
+        data = json.loads(_stat_cache_path(db_path).read_text())
+        return {path: tuple(sig) for path, sig in data["files"].items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
+
+
+def _save_stat_cache(db_path: Path, cache: dict[str, tuple]) -> None:
+    path = _stat_cache_path(db_path)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        tmp.write_text(json.dumps({"files": cache}))
+        tmp.replace(path)
+    except OSError:
+        logger.exception("failed to save stat cache: %s", path)
+
+
+class _IndexWorker:
+    """Single DB-writer thread fed by the watch loop, so event handling never waits on SQLite.
+
+    Jobs are hashable tuples: ("node", slug), ("file", path, source_root,
+    source_name, max_size_kb), ("poll",), ("calibrate",) or ("rescan",). A job
+    still waiting in the queue is not enqueued again. Node/file jobs collected
+    in one _DEBOUNCE_MS window are written in one transaction (one commit per
+    batch); a failing node/file is logged and rolled back alone via its savepoint.
+
+    A file whose (inode, mtime_ns, size) matches what was last indexed is
+    skipped without reading it; if only the stat changed, a content digest equal
+    to the last indexed one still skips index_file (touch, same-content save).
+    That cache is saved next to the DB on stop().
+    """
+
+    def __init__(self, nodes_dir: Path, db_path: Path, sources: list[dict] | None, cfg: KGConfig | None) -> None:
+        self.nodes_dir = nodes_dir
+        self.db_path = db_path
+        self.sources = sources or []
+        self.cfg = cfg
+        self._q: queue.Queue[tuple | None] = queue.Queue(maxsize=_WORK_QUEUE_MAX)
+        self._queued: set[tuple] = set()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="kg-index-worker", daemon=True)
+        self.stat_cache = _load_stat_cache(db_path)  # path -> (ino, mtime_ns, size, digest)
+        self._attempts: dict[tuple, int] = {}  # job -> failed batches so far (worker thread only)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Finish the jobs already queued, then end the thread."""
+        self._q.put(None)
+        self._thread.join()
+        _save_stat_cache(self.db_path, self.stat_cache)
+
+    def put(self, job: tuple) -> None:
+        with self._lock:
+            if job in self._queued:
+                return
+            self._queued.add(job)
+        self._q.put(job)  # blocks only if the worker is _WORK_QUEUE_MAX jobs behind
+
+    @property
+    def pending(self) -> int:
+        """Jobs queued but not yet picked up (queue depth)."""
+        return self._q.qsize()
+
+    def _run(self) -> None:
+        batch: list[tuple] = []  # reused for every batch
+        stopping = False
+        while not stopping:
+            batch.clear()
+            job = self._q.get()
+            # Keep collecting briefly so a burst of saves lands in one transaction
+            deadline = time.monotonic() + _DEBOUNCE_MS / 1000
+            while job is not None:
+                batch.append(job)
+                if len(batch) >= _BATCH_MAX:
+                    break
+                try:
+                    job = self._q.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            stopping = job is None
+            with self._lock:
+                self._queued.difference_update(batch)
+            if batch:
+                logger.debug("index batch: %d jobs, %d still queued", len(batch), self.pending)
+                self._run_batch(batch)
+
+    def _run_batch(self, jobs: list[tuple]) -> None:
+        writes = [job for job in jobs if job[0] in ("node", "file")]
+        if writes:
+            self._write(writes)
+        for job in jobs:
+            kind = job[0]
+            if kind == "poll":
+                _poll_sources(self.sources, self.db_path, stat_cache=self.stat_cache)
+            elif kind == "calibrate" and self.cfg is not None:
+                _auto_calibrate_if_stale(self.db_path, self.cfg)
+            elif kind == "rescan":
+                _startup_index(self.nodes_dir, self.db_path, self.sources, self.cfg, stat_cache=self.stat_cache)
+
+    def _write(self, jobs: list[tuple]) -> None:
+        if self.cfg is not None and self.cfg.use_turso:
+            batch = contextlib.nullcontext(None)  # remote DB: keep per-item commits
+        else:
+            batch = batch_writer(self.db_path)
+        # Parse and embed nodes before the transaction: it holds the write lock,
+        # so it only applies rows; vectors go to the vector server after commit
+        nodes = {job[1]: _load_node(job[1], self.nodes_dir) for job in jobs if job[0] == "node"}
+        vectors = _node_embeddings(nodes.items(), self.cfg)
+        written: list[str] = []
+        indexed: dict[str, tuple] = {}
+        try:
+            with batch as conn:
+                for job in jobs:
+                    if job[0] == "node":
+                        slug = job[1]
+                        if _index_node(
+                            slug, self.nodes_dir, self.db_path, cfg=self.cfg, conn=conn, node=nodes[slug],
+                            embedding=vectors.get(slug),
+                        ):
+                            written.append(slug)
+                        continue
+                    _, path, source_root, source_name, max_size_kb = job
+                    sig = _stat_sig(path)
+                    cached = self.stat_cache.get(path)
+                    if sig is not None and cached is not None and cached[:3] == sig:
+                        continue  # touched but unchanged — don't read it
+                    digest = _file_digest(path) if sig is not None and sig[2] <= max_size_kb * 1024 else None
+                    if sig is not None and digest is not None and cached is not None and cached[3] == digest:
+                        indexed[path] = (*sig, digest)  # same bytes, new stat
+                        continue
+                    ok = _index_source_file(
+                        Path(path),
+                        source_root=Path(source_root),
+                        source_name=source_name,
+                        db_path=self.db_path,
+                        max_size_kb=max_size_kb,
+                        conn=conn,
+                    )
+                    if ok and sig is not None:
+                        indexed[path] = (*sig, digest)
+            self.stat_cache.update(indexed)  # only once the batch is committed
+        except Exception:
+            # BEGIN/COMMIT failed (e.g. another writer held the lock past the busy
+            # timeout): nothing was written, and inotify won't report these again
+            logger.exception("batch re-index failed (%d jobs), re-queueing", len(jobs))
+            self._requeue(jobs)
+            return
+        if self._attempts:
+            for job in jobs:
+                self._attempts.pop(job, None)
+        _push_embeddings(vectors, written, self.cfg)
+
+    def _requeue(self, jobs: list[tuple]) -> None:
+        """Queue the jobs of a failed batch again, up to _WRITE_ATTEMPTS tries each."""
+        for job in jobs:
+            attempts = self._attempts.get(job, 0) + 1
+            if attempts >= _WRITE_ATTEMPTS:
+                self._attempts.pop(job, None)
+                logger.error("giving up on %s after %d failed batches", job[:2], attempts)
+                continue
+            with self._lock:
+                if job in self._queued:
+                    continue
+                self._queued.add(job)
+            try:
+                self._q.put_nowait(job)  # never block: this thread is the consumer
+            except queue.Full:
+                with self._lock:
+                    self._queued.discard(job)
+                logger.error("work queue full, dropping %s", job[:2])  # noqa: TRY400  (traceback is noise)
+                continue
+            self._attempts[job] = attempts
+
+
+def _housekeeping(cfg: KGConfig | None, worker: _IndexWorker, last_calibrate: float) -> float:
+    """Per-pass tail shared by both watch loops: queue due calibration, honour SIGHUP.
+
+    Returns the updated last_calibrate; raises _ReloadRequestedError on reload.
+    """
+    if cfg is not None and (_calibrate_now[0] or time.monotonic() - last_calibrate >= _CALIBRATE_INTERVAL):
+        _calibrate_now[0] = False
+        worker.put(("calibrate",))
+        last_calibrate = time.monotonic()
+    if _reload_state[0]:
+        raise _ReloadRequestedError
+    return last_calibrate
 
 
 # ---------------------------------------------------------------------------
@@ -112,42 +435,83 @@ def _auto_calibrate_if_stale(db_path: Path, cfg: KGConfig) -> None:
         logger.exception("auto-calibrate failed")
 
 
-def watch_inotify(nodes_dir: Path, db_path: Path, sources: list[dict] | None = None, cfg: KGConfig | None = None) -> None:
-    """Watch using inotify_simple (Linux). Blocks forever.
+def watch_inotify(
+    nodes_dir: Path,
+    sources: list[dict] | None = None,
+    cfg: KGConfig | None = None,
+    *,
+    worker: _IndexWorker,
+) -> None:
+    """Watch using inotify_simple (Linux). Blocks forever; *worker* does the indexing.
 
     sources: list of {path: Path, name: str, max_size_kb: int}
+
+    Waits on the inotify fd and a wake-up eventfd together, so SIGHUP/SIGUSR1
+    are handled immediately instead of after the current read timeout.
     """
     import inotify_simple  # type: ignore[import]
 
-    inotify = inotify_simple.INotify()
+    inotify = inotify_simple.INotify(nonblocking=True)
     flags = inotify_simple.flags  # type: ignore[attr-defined]
+    wake_fd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+    selector = selectors.DefaultSelector()
+    selector.register(inotify.fileno(), selectors.EVENT_READ)
+    selector.register(wake_fd, selectors.EVENT_READ)
+    _wake_fd[0] = wake_fd
 
-    # Track watch descriptors → (dir_path, kind, source_meta)
-    # kind: "nodes_root", "node_dir", "source_dir"
-    watched: dict[int, tuple[Path, str, dict]] = {}
+    try:
+        _inotify_loop(inotify, flags, selector, wake_fd, nodes_dir, sources, cfg, worker)
+    finally:
+        _wake_fd[0] = -1
+        selector.close()
+        os.close(wake_fd)
+        inotify.close()
+
+
+def _inotify_loop(
+    inotify: Any,
+    flags: Any,
+    selector: selectors.BaseSelector,
+    wake_fd: int,
+    nodes_dir: Path,
+    sources: list[dict] | None,
+    cfg: KGConfig | None,
+    worker: _IndexWorker,
+) -> None:
+    # Every watch is on a directory: ONLYDIR refuses anything else, DONT_FOLLOW
+    # avoids watching through symlinks, EXCL_UNLINK drops events for unlinked files
+    dir_opts = flags.ONLYDIR | flags.DONT_FOLLOW | flags.EXCL_UNLINK
+    root_mask = flags.CREATE | flags.MOVED_TO | dir_opts
+    dir_mask = flags.CLOSE_WRITE | flags.MOVED_TO | dir_opts
+
+    # Track watch descriptors → (dir path + os.sep, kind, meta); str, not Path, so the
+    # per-event path is a concatenation. kind: "nodes_root", "node_dir", "source_dir";
+    # meta is the source dict for source dirs and {"slug": ...} for node dirs.
+    watched: dict[int, tuple[str, str, dict]] = {}
+    sep = os.sep
 
     # Watch nodes root
-    wd = inotify.add_watch(str(nodes_dir), flags.CREATE | flags.MOVED_TO)
-    watched[wd] = (nodes_dir, "nodes_root", {})
+    wd = inotify.add_watch(str(nodes_dir), root_mask)
+    watched[wd] = (str(nodes_dir) + sep, "nodes_root", {})
 
     # Watch existing node dirs
-    for node_dir in nodes_dir.iterdir():
-        if node_dir.is_dir():
-            wd = inotify.add_watch(str(node_dir), flags.CLOSE_WRITE | flags.MOVED_TO)
-            watched[wd] = (node_dir, "node_dir", {})
+    for node_dir in _node_dirs(nodes_dir):
+        wd = inotify.add_watch(str(node_dir), dir_mask)
+        watched[wd] = (str(node_dir) + sep, "node_dir", {"slug": node_dir.name})
 
-    # Watch source dirs (recursively via rglob subdirs)
+    # Watch source dirs (recursively; os.walk types entries from the dirent, no stat per path)
     for src in (sources or []):
         src_path: Path = src["path"]
         if src_path.exists():
-            wd = inotify.add_watch(str(src_path), flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE)
-            watched[wd] = (src_path, "source_dir", src)
+            wd = inotify.add_watch(str(src_path), dir_mask | flags.CREATE)
+            watched[wd] = (str(src_path) + sep, "source_dir", src)
             # Watch subdirs too
-            for sub in src_path.rglob("*"):
-                if sub.is_dir():
+            for dirpath, dirnames, _filenames in os.walk(src_path):
+                for name in dirnames:
+                    sub = os.path.join(dirpath, name)  # noqa: PTH118  (watch table is keyed by str paths)
                     try:
-                        wd = inotify.add_watch(str(sub), flags.CLOSE_WRITE | flags.MOVED_TO)
-                        watched[wd] = (sub, "source_dir", src)
+                        wd = inotify.add_watch(sub, dir_mask)
+                        watched[wd] = (sub + sep, "source_dir", src)
                     except OSError:
                         pass
 
@@ -156,186 +520,296 @@ def watch_inotify(nodes_dir: Path, db_path: Path, sources: list[dict] | None = N
     last_poll = time.monotonic()
     last_calibrate = time.monotonic()
 
+    # Hoisted out of the per-event loop; IN_ISDIR comes with the event, so no stat is needed
+    in_isdir, in_overflow = flags.ISDIR, flags.Q_OVERFLOW
+    in_create_dir = flags.CREATE | flags.ISDIR
+    watched_get = watched.get
+
     while True:
-        for event in inotify.read(timeout=_INOTIFY_TIMEOUT_MS):
+        # Block until an event arrives or the next poll/calibration is due
+        now = time.monotonic()
+        timeout = _INOTIFY_TIMEOUT_MS / 1000
+        if sources:
+            timeout = min(timeout, last_poll + _POLL_INTERVAL - now)
+        if cfg is not None:
+            timeout = min(timeout, last_calibrate + _CALIBRATE_INTERVAL - now)
+        timeout = max(0.0, timeout)
+        for key, _mask in selector.select(timeout=timeout):
+            if key.fd == wake_fd:
+                with contextlib.suppress(BlockingIOError):
+                    os.eventfd_read(wake_fd)
+        # A single read() may not return everything queued; drain until empty
+        events: list = []
+        while batch := inotify.read(timeout=0):
+            events.extend(batch)
+        for event in events:
+            if event.mask & in_overflow:
+                # The kernel dropped events; only a full pass is guaranteed to catch up
+                logger.warning(
+                    "inotify queue overflow — forcing rescan; if this recurs, raise the kernel limit"
+                    " (as root): sysctl fs.inotify.max_queued_events=%d",
+                    _INOTIFY_MAX_QUEUED_EVENTS,
+                )
+                worker.put(("rescan",))
+                last_poll = time.monotonic()  # the rescan covers the periodic poll
+                continue
             path_name = event.name
             if not path_name:
                 continue
 
-            wd = event.wd
-            if wd not in watched:
+            entry = watched_get(event.wd)
+            if entry is None:
                 continue
-
-            dir_path, kind, meta = watched[wd]
+            dir_prefix, kind, meta = entry
 
             if kind == "nodes_root":
                 # New subdirectory created
-                if event.mask & flags.CREATE:
-                    new_dir = nodes_dir / path_name
-                    if new_dir.is_dir():
-                        new_wd = inotify.add_watch(str(new_dir), flags.CLOSE_WRITE | flags.MOVED_TO)
-                        watched[new_wd] = (new_dir, "node_dir", {})
+                if event.mask & in_create_dir == in_create_dir:
+                    try:
+                        new_wd = inotify.add_watch(dir_prefix + path_name, dir_mask)
+                        watched[new_wd] = (dir_prefix + path_name + sep, "node_dir", {"slug": path_name})
+                    except OSError:
+                        continue
+                    # node.jsonl may have been written before the watch existed
+                    worker.put(("node", path_name))
 
             elif kind == "node_dir":
-                if path_name.endswith(".jsonl"):
-                    changed = dir_path / path_name
-                    slug = _slug_from_path(nodes_dir, changed)
-                    if slug:
-                        _index_node(slug, nodes_dir, db_path, cfg=cfg)
+                if path_name[-6:] == ".jsonl":
+                    worker.put(("node", meta["slug"]))
 
             elif kind == "source_dir":
-                changed = dir_path / path_name
-                if changed.is_dir():
+                changed = dir_prefix + path_name
+                if event.mask & in_isdir:
                     # New subdirectory — start watching it
                     try:
-                        new_wd = inotify.add_watch(str(changed), flags.CLOSE_WRITE | flags.MOVED_TO)
-                        watched[new_wd] = (changed, "source_dir", meta)
+                        new_wd = inotify.add_watch(changed, dir_mask)
+                        watched[new_wd] = (changed + sep, "source_dir", meta)
                     except OSError:
-                        pass
-                elif changed.is_file():
-                    _index_source_file(
-                        changed,
-                        source_root=meta["path"],
-                        source_name=meta.get("name", ""),
-                        db_path=db_path,
-                        max_size_kb=meta.get("max_size_kb", 512),
-                    )
+                        continue
+                    # Pick up files written before the watch existed
+                    for file_path, _st in _scan_files(changed):
+                        worker.put(_file_job(file_path, meta))
+                else:
+                    worker.put(_file_job(changed, meta))  # index_file skips it if it is gone by then
 
         # Periodic full poll of sources (catch missed events / deletions)
         now = time.monotonic()
         if now - last_poll >= _POLL_INTERVAL and sources:
-            _poll_sources(sources, db_path)
+            worker.put(("poll",))
             last_poll = now
 
-        now_cal = time.monotonic()
-        if _calibrate_now[0] and cfg is not None:
-            _calibrate_now[0] = False
-            _auto_calibrate_if_stale(db_path, cfg)
-            last_calibrate = time.monotonic()
-        elif now_cal - last_calibrate >= _CALIBRATE_INTERVAL and cfg is not None:
-            _auto_calibrate_if_stale(db_path, cfg)
-            last_calibrate = now_cal
-
-        if _reload_state[0]:
-            raise _ReloadRequestedError
+        last_calibrate = _housekeeping(cfg, worker, last_calibrate)
 
 
 # ---------------------------------------------------------------------------
 # Polling fallback
 # ---------------------------------------------------------------------------
 
-def _poll_sources(sources: list[dict], db_path: Path) -> None:
+def _poll_sources(sources: list[dict], db_path: Path, stat_cache: dict[str, tuple] | None = None) -> None:
     for src in sources:
         try:
             cfg_src = src.get("config")
             if cfg_src is not None:
-                _poll_index_source(cfg_src, db_path=db_path)
+                _poll_index_source(cfg_src, db_path=db_path, stat_cache=stat_cache)
         except Exception:
             logger.exception("poll failed for source: %s", src.get("name"))
 
 
+def _scan_files(root: str) -> Iterator[tuple[str, os.stat_result]]:
+    """Yield (path, stat) for regular files under root, skipping symlinks.
+
+    Uses os.scandir so entry types come from the dirent; one stat per file.
+    """
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry.path, entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+
+
 def watch_poll(
     nodes_dir: Path,
-    db_path: Path,
     sources: list[dict] | None = None,
-    interval: float = 1.0,
+    interval: float = 0.25,
     cfg: KGConfig | None = None,
+    *,
+    worker: _IndexWorker,
+) -> None:
+    """Polling fallback for macOS/Docker.
+
+    Polls every *interval* seconds right after a change and backs off by
+    _POLL_BACKOFF per quiet pass up to _POLL_IDLE_MAX_S. The sleep is a select()
+    on a pipe that signal handlers write to, so SIGHUP/SIGUSR1 cut it short.
+
+    Files are tracked by (st_dev, st_ino) -> (st_mtime_ns, st_size), rebuilt on
+    every scan so replaced/deleted files do not accumulate.
+    """
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_r, False)
+    os.set_blocking(wake_w, False)
+    _wake_fd[0] = wake_w
+    try:
+        _poll_loop(nodes_dir, sources, interval, cfg, worker, wake_r)
+    finally:
+        _wake_fd[0] = -1
+        os.close(wake_r)
+        os.close(wake_w)
+
+
+def _poll_loop(
+    nodes_dir: Path,
+    sources: list[dict] | None,
+    interval: float,
+    cfg: KGConfig | None,
+    worker: _IndexWorker,
+    wake_r: int,
 ) -> None:
-    """Polling fallback for macOS/Docker. Checks mtime every interval seconds."""
-    seen_nodes: dict[Path, float] = {}
-    seen_files: dict[Path, float] = {}
-    logger.info("polling nodes=%s interval=%.1fs", nodes_dir, interval)
+    seen_nodes: dict[tuple[int, int], tuple[int, int]] = {}
+    seen_files: dict[tuple[int, int], tuple[int, int]] = {}
+    logger.info("polling nodes=%s interval=%.2f-%.0fs", nodes_dir, interval, _POLL_IDLE_MAX_S)
     last_source_poll = time.monotonic()
     last_calibrate = time.monotonic()
 
+    pace = interval
     while True:
+        changed = False
         # Poll nodes/
-        for node_dir in nodes_dir.iterdir():
-            if not node_dir.is_dir():
-                continue
+        scanned: dict[tuple[int, int], tuple[int, int]] = {}
+        for node_dir in _node_dirs(nodes_dir):
             for fname in ("node.jsonl", "meta.jsonl"):
-                f = node_dir / fname
-                if not f.exists():
+                try:
+                    st = (node_dir / fname).stat()
+                except OSError:
                     continue
-                mtime = f.stat().st_mtime
-                if seen_nodes.get(f, 0.0) < mtime:
-                    seen_nodes[f] = mtime
-                    slug = _slug_from_path(nodes_dir, f)
-                    if slug:
-                        _index_node(slug, nodes_dir, db_path, cfg=cfg)
+                key, sig = (st.st_dev, st.st_ino), (st.st_mtime_ns, st.st_size)
+                scanned[key] = sig
+                if seen_nodes.get(key) != sig:
+                    worker.put(("node", node_dir.name))
+                    changed = True
+        seen_nodes = scanned
 
         # Poll source files periodically
         now = time.monotonic()
         if now - last_source_poll >= _POLL_INTERVAL and sources:
+            scanned = {}
             for src in (sources or []):
-                src_path: Path = src["path"]
-                if not src_path.exists():
-                    continue
-                for f in src_path.rglob("*"):
-                    if not f.is_file():
-                        continue
-                    try:
-                        mtime = f.stat().st_mtime
-                    except OSError:
-                        continue
-                    if seen_files.get(f, 0.0) < mtime:
-                        seen_files[f] = mtime
-                        _index_source_file(
-                            f,
-                            source_root=src_path,
-                            source_name=src.get("name", ""),
-                            db_path=db_path,
-                            max_size_kb=src.get("max_size_kb", 512),
-                        )
+                for path, st in _scan_files(str(src["path"])):
+                    key, sig = (st.st_dev, st.st_ino), (st.st_mtime_ns, st.st_size)
+                    scanned[key] = sig
+                    if seen_files.get(key) != sig:
+                        worker.put(_file_job(path, src))
+                        changed = True
+            seen_files = scanned
             last_source_poll = now
 
-        now_cal = time.monotonic()
-        if _calibrate_now[0] and cfg is not None:
-            _calibrate_now[0] = False
-            _auto_calibrate_if_stale(db_path, cfg)
-            last_calibrate = time.monotonic()
-        elif now_cal - last_calibrate >= _CALIBRATE_INTERVAL and cfg is not None:
-            _auto_calibrate_if_stale(db_path, cfg)
-            last_calibrate = now_cal
-
-        if _reload_state[0]:
-            raise _ReloadRequestedError
+        last_calibrate = _housekeeping(cfg, worker, last_calibrate)
 
-        time.sleep(interval)
+        # Snap back to the fast pace after a change, back off while idle
+        pace = interval if changed else min(pace * _POLL_BACKOFF, _POLL_IDLE_MAX_S)
+        if select.select([wake_r], [], [], pace)[0]:
+            with contextlib.suppress(BlockingIOError):
+                os.read(wake_r, 512)
 
 
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
 
-def _startup_index(nodes_dir: Path, db_path: Path, sources: list[dict] | None, cfg: KGConfig | None) -> None:
+def _load_node(slug: str, nodes_dir: Path) -> FileNode | None:
+    """Parse one node (also in startup pool processes); None lets index_node re-read it and log."""
+    try:
+        return FileStore(nodes_dir).get(slug)
+    except Exception:
+        return None
+
+
+def _startup_index_nodes(nodes_dir: Path, db_path: Path, cfg: KGConfig | None) -> None:
+    slugs = [d.name for d in _node_dirs(nodes_dir)]
+    if len(slugs) >= _PARALLEL_STARTUP_MIN and (cfg is None or not cfg.use_turso):
+        # Parse node.jsonl files in parallel; this process stays the only DB writer.
+        # spawn, not fork: the rescan path runs this with other threads alive.
+        try:
+            with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as pool:
+                loaded = zip(slugs, pool.map(_load_node, slugs, itertools.repeat(nodes_dir), chunksize=64), strict=True)
+                while group := list(itertools.islice(loaded, _BATCH_MAX)):
+                    vectors = _node_embeddings(group, cfg)  # before BEGIN: no lock held while embedding
+                    written: list[str] = []
+                    with batch_writer(db_path) as conn:
+                        for slug, node in group:
+                            if _index_node(
+                                slug, nodes_dir, db_path, cfg=cfg, conn=conn, node=node,
+                                embedding=vectors.get(slug),
+                            ):
+                                written.append(slug)
+                    _push_embeddings(vectors, written, cfg)
+            return
+        except Exception:
+            logger.exception("startup: parallel node index failed, retrying serially")
+    for slug in slugs:
+        node = _load_node(slug, nodes_dir)
+        vectors = _node_embeddings([(slug, node)], cfg)
+        if _index_node(slug, nodes_dir, db_path, cfg=cfg, node=node, embedding=vectors.get(slug)):
+            _push_embeddings(vectors, [slug], cfg)
+
+
+def _startup_index(
+    nodes_dir: Path,
+    db_path: Path,
+    sources: list[dict] | None,
+    cfg: KGConfig | None,
+    stat_cache: dict[str, tuple] | None = None,
+) -> None:
     """Re-index all nodes and sources synchronously on startup.
 
     Runs on the main thread BEFORE the event loop starts, so there is only one
     DB writer at a time (avoids concurrent-write corruption on virtiofs/NFS).
     Ensures any nodes/files added while the watcher was stopped are indexed.
-    Uses content-hash checking, so unchanged content is a no-op.
+    Uses content-hash checking, so unchanged content is a no-op; with the
+    worker's stat_cache, unchanged source files are not even read.
     """
     logger.info("startup: indexing all nodes")
     if nodes_dir.exists():
-        for node_dir in nodes_dir.iterdir():
-            if node_dir.is_dir():
-                slug = node_dir.name
-                _index_node(slug, nodes_dir, db_path, cfg=cfg)
+        _startup_index_nodes(nodes_dir, db_path, cfg)
     if sources:
         logger.info("startup: indexing all sources")
-        _poll_sources(sources, db_path)
+        _poll_sources(sources, db_path, stat_cache=stat_cache)
     logger.info("startup: index complete")
 
 
 def run(nodes_dir: Path, db_path: Path, sources: list[dict] | None = None, cfg: KGConfig | None = None) -> None:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
-    _startup_index(nodes_dir, db_path, sources, cfg)
+    if cfg is None or not cfg.use_turso:
+        try:
+            conn = cfg_from_path(db_path)
+            try:
+                tune_writer(conn)  # journal_mode=WAL persists in the DB file
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            logger.exception("failed to set writer pragmas on %s", db_path)
+    worker = _IndexWorker(nodes_dir, db_path, sources, cfg)  # loads the saved stat cache
+    _startup_index(nodes_dir, db_path, sources, cfg, stat_cache=worker.stat_cache)
+    worker.start()
     try:
-        watch_inotify(nodes_dir, db_path, sources, cfg=cfg)
-    except ImportError:
-        logger.warning("inotify_simple not available, falling back to polling")
-        watch_poll(nodes_dir, db_path, sources, cfg=cfg)
+        try:
+            watch_inotify(nodes_dir, sources, cfg=cfg, worker=worker)
+        except ImportError:
+            logger.warning("inotify_simple not available, falling back to polling")
+            watch_poll(nodes_dir, sources, cfg=cfg, worker=worker)
+    finally:
+        worker.stop()
 
 
 def run_from_config(config_root: Path | None = None) -> None:
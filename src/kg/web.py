@@ -8,38 +8,99 @@ Routes:
 
 from __future__ import annotations
 
+import contextlib
+import gzip
+import hashlib
 import html as _html
+import itertools
 import json
+import logging
+import os
 import re
+import socket
 import socketserver
+import sqlite3
+import struct
+import threading
+import time
 import urllib.parse
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from typing import TYPE_CHECKING, Any
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # optional speedup: pip install orjson
+    from json import loads as _json_loads
+
+try:
+    import ahocorasick  # type: ignore[import-not-found]
+except ImportError:  # optional speedup: pip install pyahocorasick
+    ahocorasick = None
+
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
     from pathlib import Path
 
+    from kg.agents.launcher import AgentDef
     from kg.config import KGConfig
     from kg.models import FileNode
 
+logger = logging.getLogger("kg.web")
+
 # ─── Text rendering ───────────────────────────────────────────────────────────
 
+# Every inline construct _render understands, matched in one left-to-right pass;
+# m.lastgroup names the construct.  Code and bold may span line breaks.  A URL
+# never ends in punctuation: that belongs to the sentence, not the link.
+_TOKEN_RE = re.compile(
+    r"(?P<url>https?://\S*[^\s.,;:!?)'\"])"
+    r"|`(?P<code>(?s:.+?))`"
+    r"|\[\[(?P<slug>[a-z0-9][a-z0-9\-]*[a-z0-9])\]\]"
+    r"|\*\*(?P<bold>(?s:.+?))\*\*"
+)
 _SLUG_RE = re.compile(r"\[\[([a-z0-9][a-z0-9\-]*[a-z0-9])\]\]")
-_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
-_CODE_RE = re.compile(r"`(.+?)`")
-_URL_RE = re.compile(r"https?://\S+")
-# Matches path-like strings (at least one /) for auto-linkification to _doc-* nodes
-_PATH_RE = re.compile(r"(?<![/\w])[a-zA-Z0-9_][a-zA-Z0-9_\-\.]*(?:/[a-zA-Z0-9_\-\.]+)+")
+# _TOKEN_RE plus path-like strings (at least one /) for auto-linkification to
+# _doc-* nodes.  Possessive, and never running into "://", so "dir/https://x"
+# still yields the URL.
+_TOKEN_PATH_RE = re.compile(
+    _TOKEN_RE.pattern
+    + r"|(?P<path>(?<![/\w])[a-zA-Z0-9_][a-zA-Z0-9_\-\.]*+(?:/[a-zA-Z0-9_\-\.]+)++)(?!://)"
+)
 # Sentence boundary: ". " before uppercase, "[", or "(" — used to add visual line breaks
 _SENT_RE = re.compile(r"\. (?=[A-Z\[\(])")
 # Matches _fleeting-* node slugs in tool output
 _FLEETING_RE = re.compile(r"(_fleeting-[a-z0-9_-]+)")
+# Backtick code span or sentence boundary — one pass for _break_sentences
+_CODE_OR_SENT_RE = re.compile(r"(`[^`]*`)|\. (?=[A-Z\[\(])")
+
+# Single escaping entry point for the render hot path.  html.escape's chained
+# str.replace calls beat str.translate with a str->str table on CPython, so
+# keep it, but bind it once so every call site resolves a module global.
+_escape = _html.escape
+
+
+def _esc(s: str) -> str:
+    """html.escape(s), returning s untouched when it has nothing to escape."""
+    if "&" in s or "<" in s or ">" in s or '"' in s or "'" in s:
+        return _escape(s)
+    return s
 
 
 def _break_sentences(text: str) -> str:
     """Insert newlines at sentence boundaries, skipping backtick code spans."""
-    parts = re.split(r"(`[^`]*`)", text)
-    return "".join(_SENT_RE.sub(".\n", p) if i % 2 == 0 else p for i, p in enumerate(parts))
+    if ". " not in text:
+        return text
+    if "`" not in text:
+        return _SENT_RE.sub(".\n", text)
+    return _CODE_OR_SENT_RE.sub(_code_or_break, text)
+
+
+def _code_or_break(m: re.Match[str]) -> str:
+    """_CODE_OR_SENT_RE replacement: keep a code span, break a sentence."""
+    return m.group(1) or ".\n"
 
 
 def _tool_summary(name: str, inp: dict) -> str:  # noqa: PLR0911
@@ -49,7 +110,7 @@ def _tool_summary(name: str, inp: dict) -> str:  # noqa: PLR0911
         return ("…" + p[-55:]) if len(p) > 55 else p
     if name == "Bash":
         cmd = inp.get("command", "")
-        first = cmd.split("\n")[0]
+        first = cmd.partition("\n")[0]
         return (first[:70] + "…") if len(first) > 70 else first
     if name == "Glob":
         return inp.get("pattern", "")[:60]
@@ -101,83 +162,240 @@ def _tool_summary(name: str, inp: dict) -> str:  # noqa: PLR0911
 
 def _render_tool_result(text: str, slugs: set[str]) -> str:
     """Escape tool result text and turn _fleeting-* node slugs into links."""
-    parts: list[str] = []
-    last = 0
-    for m in _FLEETING_RE.finditer(text):
+    # Escaping never touches slug characters nor creates "_fleeting-", so the
+    # whole blob is escaped in one go and slugs are linked in the result
+    esc = _esc(text)
+    if "_fleeting-" not in esc:
+        return esc
+
+    def _link(m: re.Match[str]) -> str:
         slug = m.group(1)
-        parts.append(_html.escape(text[last:m.start()]))
-        if slug in slugs:
-            parts.append(f'<a href="/node/{slug}" style="color:var(--ac)">{_html.escape(slug)}</a>')
+        return f'<a href="/node/{slug}" style="color:var(--ac)">{slug}</a>' if slug in slugs else slug
+
+    return _FLEETING_RE.sub(_link, esc)
+
+
+# Slug sets re-read from SQLite at most once per DB change.  In WAL mode commits
+# land in the -wal file first, so both files go into the signature; the TTL
+# bounds staleness if a write lands within the filesystem's mtime granularity.
+_DB_CACHE_TTL_S = 2.0
+_SLUGS_CACHE: dict[str, tuple[tuple[int, ...], float, set[str]]] = {}
+_PATH_SLUGS_CACHE: dict[str, tuple[tuple[int, ...], float, dict[str, str]]] = {}
+_INDEX_ROWS_CACHE: dict[str, tuple[tuple[int, ...], float, tuple[list[str], list[str]]]] = {}
+_CALIBRATION_CACHE: dict[str, tuple[tuple[int, ...], float, dict[str, list[float]]]] = {}
+
+
+def _db_signature(cfg: KGConfig) -> tuple[int, ...] | None:
+    """(mtime_ns, size) of the local DB and its WAL, or None when not cacheable."""
+    if cfg.use_turso:
+        return None
+    sig: list[int] = []
+    for path in (cfg.db_path, cfg.db_path.with_name(cfg.db_path.name + "-wal")):
+        try:
+            st = path.stat()
+        except OSError:
+            sig += (0, 0)
         else:
-            parts.append(_html.escape(slug))
-        last = m.end()
-    parts.append(_html.escape(text[last:]))
-    return "".join(parts)
+            sig += (st.st_mtime_ns, st.st_size)
+    return tuple(sig)
+
+
+def _cached(cache: dict[str, tuple[tuple[int, ...], float, Any]], cfg: KGConfig, sig: tuple[int, ...] | None) -> Any:
+    """Return the cached value for cfg if its DB signature and TTL still hold."""
+    hit = cache.get(str(cfg.db_path)) if sig is not None else None
+    if hit is not None and hit[0] == sig and time.monotonic() - hit[1] < _DB_CACHE_TTL_S:
+        return hit[2]
+    return None
+
+
+# Idle read connections to the local graph DB, shared by request threads (hence
+# check_same_thread=False).  Each remembers the DB inode it was opened on so a
+# rebuild that unlinks and recreates graph.db retires them.  Turso connections
+# are not pooled.
+_CONN_POOL_MAX = 4
+_CONN_POOL: dict[str, list[tuple[int, sqlite3.Connection]]] = {}
+_CONN_POOL_LOCK = threading.Lock()
+
+
+@contextlib.contextmanager
+def _db_conn(cfg: KGConfig) -> Iterator[sqlite3.Connection]:
+    """Borrow a read connection to cfg's graph DB; raises if the DB is missing."""
+    if cfg.use_turso:
+        from kg.db import get_conn
+        remote = get_conn(cfg)
+        try:
+            yield remote
+        finally:
+            remote.close()
+        return
+    key = str(cfg.db_path)
+    ino = cfg.db_path.stat().st_ino
+    conn: sqlite3.Connection | None = None
+    with _CONN_POOL_LOCK:
+        idle = _CONN_POOL.get(key, [])
+        while idle and conn is None:
+            pooled_ino, pooled = idle.pop()
+            if pooled_ino == ino:
+                conn = pooled
+            else:
+                pooled.close()
+    if conn is None:
+        conn = sqlite3.connect(key, check_same_thread=False)
+        conn.execute("PRAGMA query_only=ON")
+    try:
+        yield conn
+    except BaseException:
+        conn.close()
+        raise
+    with _CONN_POOL_LOCK:
+        idle = _CONN_POOL.setdefault(key, [])
+        if len(idle) < _CONN_POOL_MAX:
+            idle.append((ino, conn))
+            return
+    conn.close()
 
 
 def _get_path_slugs(cfg: KGConfig) -> dict[str, str]:
     """Return {rel_path: doc_slug} for all indexed source files."""
-    import contextlib
+    sig = _db_signature(cfg)
+    cached = _cached(_PATH_SLUGS_CACHE, cfg, sig)
+    if cached is not None:
+        return cached
     result: dict[str, str] = {}
-    with contextlib.suppress(Exception):
-        from kg.db import get_conn
-        conn = get_conn(cfg)
+    with contextlib.suppress(Exception), _db_conn(cfg) as conn:
         result = dict(conn.execute("SELECT rel_path, slug FROM file_sources").fetchall())
-        conn.close()
+        if sig is not None:
+            _PATH_SLUGS_CACHE[str(cfg.db_path)] = (sig, time.monotonic(), result)
     return result
 
 
-def _render(text: str, slugs: set[str], path_slugs: dict[str, str] | None = None) -> str:
-    """Escape text and convert URLs, [[slug]] links, **bold**, `code`, file paths to HTML."""
-    text = _break_sentences(text)
+# [(path_slugs, automaton)] for the most recent path_slugs dict; _get_path_slugs
+# hands out the same dict until the DB changes, so this rebuilds rarely.
+_PATH_AUTOMATON: list[tuple[dict[str, str], Any]] = []
 
-    def _link(m: re.Match[str]) -> str:
-        s = m.group(1)
-        return f'<a href="/node/{s}" data-slug="{s}">[[{s}]]</a>' if s in slugs else f'<span class="dead">[[{s}]]</span>'
 
-    def _inner(seg: str) -> str:
-        return _BOLD_RE.sub(
-            r"<strong>\1</strong>",
-            _SLUG_RE.sub(_link, _CODE_RE.sub(lambda m: f"<code>{m.group(1)}</code>", _html.escape(seg).replace("\n", "<br>"))),
-        )
+def _mentions_path(text: str, path_slugs: dict[str, str]) -> bool:
+    """False only if text contains none of the path_slugs keys.
 
-    def _process_seg(seg: str) -> str:
-        """Like _inner but also auto-links known file paths."""
-        if not path_slugs:
-            return _inner(seg)
-        parts: list[str] = []
-        last = 0
-        for m in _PATH_RE.finditer(seg):
-            p = m.group(0)
-            slug = path_slugs.get(p)
-            if slug:
-                parts.append(_inner(seg[last : m.start()]))
-                parts.append(
-                    f'<a href="/node/{slug}" title="{_html.escape(p)}">'
-                    f'<code style="color:var(--lk)">{_html.escape(p)}</code></a>'
-                )
-                last = m.end()
-        parts.append(_inner(seg[last:]))
-        return "".join(parts)
+    One Aho-Corasick pass over the known paths lets most bullets skip the
+    path-aware tokenizer; without pyahocorasick every text is a candidate.
+    """
+    if ahocorasick is None:
+        return True
+    cached = _PATH_AUTOMATON[0] if _PATH_AUTOMATON else None
+    if cached is None or cached[0] is not path_slugs:
+        automaton = ahocorasick.Automaton()
+        for path in path_slugs:
+            automaton.add_word(path, None)
+        automaton.make_automaton()
+        cached = (path_slugs, automaton)
+        _PATH_AUTOMATON[:] = [cached]
+    return next(cached[1].iter(text), None) is not None
 
-    # Extract URLs before HTML-escaping so href values are intact
+
+def _render(text: str, slugs: set[str], path_slugs: dict[str, str] | None = None) -> str:
+    """Escape text and convert URLs, [[slug]] links, **bold**, `code`, file paths to HTML."""
     parts: list[str] = []
-    last = 0
-    for m in _URL_RE.finditer(text):
-        parts.append(_process_seg(text[last : m.start()]))
-        raw = m.group(0).rstrip(".,;:!?)'\"")
-        parts.append(
-            f'<a href="{_html.escape(raw)}" target="_blank" rel="noopener noreferrer">'
-            f'{_html.escape(raw)}</a>'
-        )
-        trailing = text[m.start() + len(raw) : m.end()]
-        if trailing:
-            parts.append(_html.escape(trailing))
-        last = m.end()
-    parts.append(_process_seg(text[last:]))
+    _render_into(parts, text, slugs, path_slugs)
     return "".join(parts)
 
 
+# Rendered HTML of short texts, one table per (slugs, path_slugs) pair.  Both
+# come from the DB caches, which replace rather than mutate them when the DB
+# changes, so object identity versions the table; each entry holds the objects
+# so their ids cannot be reused while it lives.
+_RENDERED: dict[tuple[int, int], tuple[set[str], dict[str, str] | None, dict[str, str]]] = {}
+_RENDERED_MAX_TABLES = 4
+_RENDERED_MAX_ENTRIES = 4096
+_RENDERED_MAX_TEXT = 2000
+# Request threads share the tables; lookups and inserts (and the evictions they
+# trigger) happen under this lock, rendering itself outside it.
+_RENDERED_LOCK = threading.Lock()
+
+
+def _render_into(parts: list[str], text: str, slugs: set[str], path_slugs: dict[str, str] | None = None) -> None:
+    """Append _render(text, ...) to parts, for callers assembling a page in one list."""
+    path_slugs = path_slugs or None
+    if len(text) > _RENDERED_MAX_TEXT:
+        _render_text(parts, text, slugs, path_slugs)
+        return
+    key = (id(slugs), id(path_slugs))
+    with _RENDERED_LOCK:
+        table = _RENDERED.get(key)
+        if table is None:
+            if len(_RENDERED) >= _RENDERED_MAX_TABLES:
+                _RENDERED.pop(next(iter(_RENDERED)), None)
+            table = _RENDERED[key] = (slugs, path_slugs, {})
+        cache = table[2]
+        html = cache.get(text)
+    if html is None:
+        out: list[str] = []
+        _render_text(out, text, slugs, path_slugs)
+        html = "".join(out)
+        with _RENDERED_LOCK:
+            if len(cache) >= _RENDERED_MAX_ENTRIES:
+                cache.clear()
+            cache[text] = html
+    parts.append(html)
+
+
+def _render_text(parts: list[str], text: str, slugs: set[str], path_slugs: dict[str, str] | None) -> None:
+    if path_slugs and not _mentions_path(text, path_slugs):
+        path_slugs = None
+    _render_tokens(parts, _break_sentences(text), slugs, path_slugs)
+
+
+def _render_tokens(parts: list[str], text: str, slugs: set[str], path_slugs: dict[str, str] | None) -> None:
+    """Append the HTML for text to parts; recurses into **bold** bodies."""
+    append = parts.append
+    if "/" not in text and "`" not in text and "[[" not in text and "**" not in text:
+        # No token can match: URLs and paths need "/", the rest their markers
+        append(_esc(text).replace("\n", "<br>"))
+        return
+    last = 0
+    for m in (_TOKEN_PATH_RE if path_slugs else _TOKEN_RE).finditer(text):
+        start, end = m.span()
+        if start > last:
+            append(_esc(text[last:start]).replace("\n", "<br>"))
+        last = end
+        kind = m.lastgroup
+        tok = m.group(kind)  # type: ignore[arg-type]
+        if kind == "slug":
+            append(_slug_link(tok, slugs))
+        elif kind == "bold":
+            append("<strong>")
+            _render_tokens(parts, tok, slugs, path_slugs)
+            append("</strong>")
+        elif kind == "code":
+            if path_slugs and tok in path_slugs:
+                append(_path_link(tok, path_slugs[tok]))
+                continue
+            code = _esc(tok).replace("\n", "<br>")
+            if "[[" in code:
+                code = _SLUG_RE.sub(lambda sm: _slug_link(sm.group(1), slugs), code)
+            append(f"<code>{code}</code>")
+        elif kind == "url":
+            href = _esc(tok)
+            append(f'<a href="{href}" target="_blank" rel="noopener noreferrer">{href}</a>')
+        else:
+            slug = path_slugs.get(tok) if path_slugs else None
+            append(_path_link(tok, slug) if slug else _esc(tok))
+    if last < len(text):
+        append(_esc(text[last:]).replace("\n", "<br>"))
+
+
+def _slug_link(s: str, slugs: set[str]) -> str:
+    """Link [[s]] to its node, or mark it dead when no such node exists."""
+    return f'<a href="/node/{s}" data-slug="{s}">[[{s}]]</a>' if s in slugs else f'<span class="dead">[[{s}]]</span>'
+
+
+@lru_cache(maxsize=4096)
+def _path_link(path: str, slug: str) -> str:
+    """Link a source file path to its _doc-* node (memoized: constant per path)."""
+    p = _esc(path)
+    return f'<a href="/node/{slug}" title="{p}"><code style="color:var(--lk)">{p}</code></a>'
+
+
 # ─── File language detection ──────────────────────────────────────────────────
 
 _EXT_LANG: dict[str, str] = {
@@ -190,9 +408,10 @@ _EXT_LANG: dict[str, str] = {
     "md": "markdown", "rst": "plaintext", "txt": "plaintext",
     "dockerfile": "dockerfile", "makefile": "makefile",
 }
-_MD_EXTS = {"md"}
+_MD_EXTS = frozenset({"md"})
 
 
+@lru_cache(maxsize=4096)
 def _file_lang(path: str) -> tuple[str, bool]:
     """Return (highlight.js language id, is_markdown) for a file path."""
     name = path.rsplit("/", 1)[-1].lower()
@@ -419,8 +638,10 @@ code{font-family:"SF Mono",Consolas,monospace;font-size:12px;background:rgba(255
 }
 """
 
-_NODE_TYPES = {"concept", "task", "decision", "agent", "session"}
-_BULLET_COLORS = {"gotcha", "decision", "task", "note", "success", "failure"}
+_NODE_TYPES = frozenset({"concept", "task", "decision", "agent", "session"})
+_BADGE_TYPES = _NODE_TYPES | {"doc"}
+_BULLET_COLORS = frozenset({"gotcha", "decision", "task", "note", "success", "failure"})
+_BULLET_CLASS = {t: f"b-{t}" for t in _BULLET_COLORS}
 
 # CDN resources for doc pages
 _HLJS_CSS = '<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.10.0/styles/github-dark.min.css">'
@@ -448,8 +669,12 @@ _TOGGLE_DOCS_JS = """
 
 
 def _badge(node_type: str) -> str:
-    cls = f"bt-{node_type}" if node_type in _NODE_TYPES | {"doc"} else "bt-other"
-    return f'<span class="badge {cls}">{_html.escape(node_type)}</span>'
+    cls = f"bt-{node_type}" if node_type in _BADGE_TYPES else "bt-other"
+    return f'<span class="badge {cls}">{_esc(node_type)}</span>'
+
+
+# Pre-rendered badges for the known types; index rows and page headers look these up
+_BADGES = {nt: _badge(nt) for nt in _BADGE_TYPES}
 
 
 _GLOBAL_JS = """
@@ -565,156 +790,247 @@ _GLOBAL_JS = """
 """
 
 
-def _page(cfg: KGConfig, title: str, body: str, q: str = "", extra_head: str = "", extra_script: str = "") -> str:
-    qesc = _html.escape(q)
-    name = _html.escape(cfg.name)
-    t = _html.escape(title)
-    script_tag = f"<script>{extra_script}</script>" if extra_script else ""
-    settings_panel = (
-        '<div id="settings-panel" class="settings-panel">'
-        '<div class="settings-row"><span class="settings-lbl">Font size</span>'
-        '<input id="font-size-input" type="range" min="11" max="36" step="1" value="14">'
-        '<span id="font-size-val" style="font-size:11px;color:var(--mt);min-width:26px">14px</span>'
-        '</div>'
-        '<div class="settings-row">'
-        '<label style="display:flex;align-items:center;gap:8px;cursor:pointer;color:var(--mt)">'
-        '<input type="checkbox" id="theme-chk" style="accent-color:var(--ac);width:15px;height:15px;cursor:pointer">'
-        'Light mode'
-        '</label>'
-        '</div>'
-        '</div>'
-    )
-    return (
-        f'<!DOCTYPE html>\n<html lang="en">\n<head>'
-        f'<meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">'
-        f'<title>{t} — {name}</title>'
-        f'<style>{_CSS}</style>'
-        f'{extra_head}'
-        f'</head>\n<body>'
-        f'<nav><a class="brand" href="/">{name}</a>'
-        f'<a href="/agents" style="color:var(--mt);font-size:13px">agents</a>'
-        f'<form action="/search" method="get">'
-        f'<input name="q" type="search" placeholder="Search nodes…" value="{qesc}" autocomplete="off">'
-        f'<button type="submit">Search</button></form>'
-        f'<button class="settings-btn" id="theme-btn" title="Toggle light/dark mode" style="margin-right:4px">🌙</button>'
-        f'<button class="settings-btn" id="settings-btn" title="Settings">⚙</button>'
-        f'</nav>'
-        f'{settings_panel}'
-        f'<main>{body}</main>'
-        f'<button id="scroll-top-btn" class="scroll-top" title="Back to top" aria-label="Scroll to top">↑</button>'
-        f'{script_tag}'
-        f'<script>{_GLOBAL_JS}</script>'
-        f'</body></html>'
-    )
+# The page skeleton around the per-request fields, UTF-8 encoded once at import.
+# _GLOBAL_JS holds non-BMP characters, so building the whole page as one str
+# would store every character in four bytes and then re-encode it per request.
+_PAGE_HEAD = (
+    b'<!DOCTYPE html>\n<html lang="en">\n<head>'
+    b'<meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">'
+    b"<title>"
+)
+# The stylesheet is served from a content-addressed URL the browser can cache
+# for good (see _Handler._static_css) rather than inlined into every page.
+_CSS_BYTES = _CSS.encode()
+_CSS_GZIP = gzip.compress(_CSS_BYTES, compresslevel=9, mtime=0)
+_CSS_PATH = f"/static/kg-{hashlib.sha256(_CSS_BYTES).hexdigest()[:12]}.css"
+_PAGE_STYLE = f'</title><link rel="stylesheet" href="{_CSS_PATH}">'.encode()
+_PAGE_NAV = b'</head>\n<body><nav><a class="brand" href="/">'
+_PAGE_SEARCH = (
+    '</a>'
+    '<a href="/agents" style="color:var(--mt);font-size:13px">agents</a>'
+    '<form action="/search" method="get">'
+    '<input name="q" type="search" placeholder="Search nodes…" value="'
+).encode()
+_PAGE_MAIN = (
+    '" autocomplete="off">'
+    '<button type="submit">Search</button></form>'
+    '<button class="settings-btn" id="theme-btn" title="Toggle light/dark mode" style="margin-right:4px">🌙</button>'
+    '<button class="settings-btn" id="settings-btn" title="Settings">⚙</button>'
+    '</nav>'
+    '<div id="settings-panel" class="settings-panel">'
+    '<div class="settings-row"><span class="settings-lbl">Font size</span>'
+    '<input id="font-size-input" type="range" min="11" max="36" step="1" value="14">'
+    '<span id="font-size-val" style="font-size:11px;color:var(--mt);min-width:26px">14px</span>'
+    '</div>'
+    '<div class="settings-row">'
+    '<label style="display:flex;align-items:center;gap:8px;cursor:pointer;color:var(--mt)">'
+    '<input type="checkbox" id="theme-chk" style="accent-color:var(--ac);width:15px;height:15px;cursor:pointer">'
+    'Light mode'
+    '</label>'
+    '</div>'
+    '</div>'
+    '<main>'
+).encode()
+_PAGE_END_MAIN = (
+    '</main>'
+    '<button id="scroll-top-btn" class="scroll-top" title="Back to top" aria-label="Scroll to top">↑</button>'
+).encode()
+_PAGE_TAIL = f"<script>{_GLOBAL_JS}</script></body></html>".encode()
+
+
+# Pages are streamed to the socket in pieces of about this many characters
+_STREAM_CHUNK = 64 * 1024
+
+
+@lru_cache(maxsize=8)
+def _site_chrome(name: str) -> tuple[bytes, bytes]:
+    """The chrome that depends only on the site name, encoded once per name.
+
+    Returns (site name + stylesheet link, nav + site name + search box up to its value).
+    """
+    name_b = _esc(name).encode()
+    return name_b + _PAGE_STYLE, _PAGE_NAV + name_b + _PAGE_SEARCH
+
+
+def _page_stream(
+    cfg: KGConfig, title: str, body: Iterable[str], q: str = "", extra_head: str = "", extra_script: str = "",
+) -> Iterator[bytes]:
+    """Like _page, but yields the encoded document in pieces as body is consumed."""
+    after_title, after_head = _site_chrome(cfg.name)
+    yield b"".join((
+        _PAGE_HEAD,
+        f"{_esc(title)} — ".encode(),
+        after_title,
+        extra_head.encode(),
+        after_head,
+        _esc(q).encode() if q else b"",
+        _PAGE_MAIN,
+    ))
+    pending: list[str] = []
+    size = 0
+    for piece in body:
+        pending.append(piece)
+        size += len(piece)
+        if size >= _STREAM_CHUNK:
+            yield "".join(pending).encode()
+            pending.clear()
+            size = 0
+    yield b"".join((
+        "".join(pending).encode(),
+        _PAGE_END_MAIN,
+        f"<script>{extra_script}</script>".encode() if extra_script else b"",
+        _PAGE_TAIL,
+    ))
+
+
+def _page(cfg: KGConfig, title: str, body: str, q: str = "", extra_head: str = "", extra_script: str = "") -> bytes:
+    """Wrap body in the site chrome; returns the UTF-8 encoded document."""
+    return b"".join(_page_stream(cfg, title, (body,), q, extra_head, extra_script))
 
 
 # ─── Page renderers ───────────────────────────────────────────────────────────
 
 def _get_slugs_db(cfg: KGConfig) -> set[str]:
     """Return all node slugs from SQLite — O(1) DB read vs O(N) filesystem syscalls."""
-    import contextlib
-    with contextlib.suppress(Exception):
-        from kg.db import get_conn
-        conn = get_conn(cfg)
+    sig = _db_signature(cfg)
+    cached = _cached(_SLUGS_CACHE, cfg, sig)
+    if cached is not None:
+        return cached
+    with contextlib.suppress(Exception), _db_conn(cfg) as conn:
         rows = conn.execute("SELECT slug FROM nodes").fetchall()
-        conn.close()
-        return {r[0] for r in rows}
+        slugs = {r[0] for r in rows}
+        if sig is not None:
+            _SLUGS_CACHE[str(cfg.db_path)] = (sig, time.monotonic(), slugs)
+        return slugs
     from kg.reader import FileStore
     return set(FileStore(cfg.nodes_dir).list_slugs())
 
 
-def _render_index(cfg: KGConfig) -> str:
-    """Render the index page using SQLite — avoids reading every node.jsonl."""
-    import contextlib
-    all_rows: list[tuple[str, str, str, int]] = []
-    with contextlib.suppress(Exception):
-        from kg.db import get_conn
-        conn = get_conn(cfg)
-        all_rows = conn.execute(
-            "SELECT slug, title, type, bullet_count FROM nodes ORDER BY title COLLATE NOCASE"
-        ).fetchall()
-        conn.close()
+def _index_rows(cfg: KGConfig) -> tuple[list[str], list[str]]:
+    """Return the index page's (node rows, source file rows) as HTML.
 
-    public = [
-        (s, t or s, nt or "concept", bc)
-        for s, t, nt, bc in all_rows
-        if not s.startswith("_")
+    Titles and slugs are escaped here, once per DB change, and the rows are
+    reused by index requests until the DB signature moves.
+    """
+    sig = _db_signature(cfg)
+    cached = _cached(_INDEX_ROWS_CACHE, cfg, sig)
+    if cached is not None:
+        return cached
+    # Public nodes and _doc-* source files; other _-prefixed nodes (fleeting
+    # notes etc.) never leave SQLite.  GLOB is case-sensitive like the old
+    # startswith() checks, and '_doc-*' is a range scan on the slug key.
+    public: list[tuple[str, str, str, int]] = []
+    docs: list[tuple[str, str, int]] = []
+    ok = False
+    with contextlib.suppress(Exception), _db_conn(cfg) as conn:
+        public = conn.execute(
+            "SELECT slug, title, type, bullet_count FROM nodes"
+            " WHERE slug NOT GLOB '_*' ORDER BY title COLLATE NOCASE"
+        ).fetchall()
+        docs = conn.execute(
+            "SELECT slug, title, bullet_count FROM nodes"
+            " WHERE slug GLOB '_doc-*' ORDER BY title COLLATE NOCASE"
+        ).fetchall()
+        ok = True
+
+    # One f-string per row, built straight from the query rows (f-strings beat
+    # %-templates on CPython 3.11)
+    html_rows = [
+        f'<div class="node-row">'
+        f'<span class="t"><a href="/node/{_esc(s)}">{_esc(t or s)}</a></span>'
+        f'<span class="m">{_BADGES.get(nt or "concept") or _badge(nt)}&nbsp;&nbsp;{bc} bullet{"" if bc == 1 else "s"}</span>'
+        f'</div>'
+        for s, t, nt, bc in public
     ]
-    docs = [
-        (s, t or s, bc)
-        for s, t, nt, bc in all_rows
-        if s.startswith("_doc-")
+    doc_rows_html = [
+        f'<div class="node-row">'
+        f'<span class="t"><a href="/node/{_esc(s)}">'
+        f'<code style="font-size:12px">{_esc(t or s)}</code></a></span>'
+        f'<span class="m">{bc} chunk{"" if bc == 1 else "s"}</span>'
+        f'</div>'
+        for s, t, bc in docs
     ]
+    if ok and sig is not None:
+        _INDEX_ROWS_CACHE[str(cfg.db_path)] = (sig, time.monotonic(), (html_rows, doc_rows_html))
+    return html_rows, doc_rows_html
 
-    html_rows = []
-    for slug, title, node_type, bc in public:
-        suffix = "" if bc == 1 else "s"
-        html_rows.append(
-            f'<div class="node-row">'
-            f'<span class="t"><a href="/node/{_html.escape(slug)}">{_html.escape(title)}</a></span>'
-            f'<span class="m">{_badge(node_type)}&nbsp;&nbsp;{bc} bullet{suffix}</span>'
-            f'</div>'
-        )
-
-    doc_rows_html = []
-    for slug, title, bc in docs:
-        suffix = "" if bc == 1 else "s"
-        doc_rows_html.append(
-            f'<div class="node-row">'
-            f'<span class="t"><a href="/node/{_html.escape(slug)}">'
-            f'<code style="font-size:12px">{_html.escape(title)}</code></a></span>'
-            f'<span class="m">{bc} chunk{suffix}</span>'
-            f'</div>'
-        )
-
-    docs_section = ""
-    docs_btn = ""
-    if docs:
-        docs_section = (
-            f'<div id="docs-section" class="hidden" style="margin-top:24px">'
-            f'<h2>Source files ({len(docs)})</h2>'
-            f'<div class="node-list">{"".join(doc_rows_html)}</div>'
-            f'</div>'
-        )
-        docs_btn = (
-            f'<button class="docs-toggle-btn" id="docs-btn" onclick="toggleDocs()">'
-            f'Show {len(docs)} source files'
-            f'</button>'
-        )
 
-    body = (
+def _render_index(cfg: KGConfig) -> Iterator[bytes]:
+    """Render the index page using SQLite — avoids reading every node.jsonl."""
+    html_rows, doc_rows_html = _index_rows(cfg)
+
+    docs_btn = (
+        f'<button class="docs-toggle-btn" id="docs-btn" onclick="toggleDocs()">'
+        f'Show {len(doc_rows_html)} source files'
+        f'</button>'
+    ) if doc_rows_html else ""
+    body = [
         f'<div style="display:flex;align-items:center;justify-content:space-between;flex-wrap:wrap;gap:10px;margin-bottom:10px">'
-        f'<h1>{_html.escape(cfg.name)}</h1>'
+        f'<h1>{_esc(cfg.name)}</h1>'
         f'{docs_btn}'
         f'</div>'
-        f'<p class="meta">{len(public)} nodes</p>'
-        f'<div class="node-list">{"".join(html_rows)}</div>'
-        + docs_section
-    )
+        f'<p class="meta">{len(html_rows)} nodes</p>'
+        f'<div class="node-list">',
+        *html_rows,
+        "</div>",
+    ]
+    if doc_rows_html:
+        body.append(
+            f'<div id="docs-section" class="hidden" style="margin-top:24px">'
+            f'<h2>Source files ({len(doc_rows_html)})</h2>'
+            f'<div class="node-list">'
+        )
+        body += doc_rows_html
+        body.append("</div></div>")
 
-    return _page(cfg, cfg.name, body, extra_script=_TOGGLE_DOCS_JS)
+    return _page_stream(cfg, cfg.name, body, extra_script=_TOGGLE_DOCS_JS)
 
 
 # ─── Doc node (source file) renderer ─────────────────────────────────────────
 
-def _github_link(source_path: str, rel_path: str) -> str | None:
-    """Return GitHub blob URL (with file commit hash) for rel_path in source_path, or None."""
+# git@github.com:user/repo.git or https://github.com/user/repo(.git)
+_GITHUB_REMOTE_RE = re.compile(r"github\.com[:/](.+?)(?:\.git)?$")
+
+
+@lru_cache(maxsize=64)
+def _github_base(source_path: str) -> str | None:
+    """Return https://github.com/user/repo for source_path's origin remote, or None.
+
+    Cached per checkout: the remote does not change under a running viewer,
+    so only the first doc page from each source pays for the git call.
+    """
     import subprocess
     try:
         r = subprocess.run(
             ["git", "-C", source_path, "remote", "get-url", "origin"],
             capture_output=True, text=True, timeout=3, check=False,
         )
-        if r.returncode != 0:
-            return None
-        remote_url = r.stdout.strip()
+    except Exception:
+        return None
+    if r.returncode != 0:
+        return None
+    # Normalise to https://github.com/user/repo
+    m = _GITHUB_REMOTE_RE.search(r.stdout.strip())
+    return f"https://github.com/{m.group(1)}" if m else None
+
+
+# Per-file links are memoized; the epoch argument expires them so files
+# committed to after the first view pick up their new hash within the hour.
+_GITHUB_LINK_TTL_S = 3600
 
-        # Normalise to https://github.com/user/repo
-        m = re.search(r"github\.com[:/](.+?)(?:\.git)?$", remote_url)
-        if not m:
-            return None
-        base = f"https://github.com/{m.group(1)}"
 
+def _github_link(source_path: str, rel_path: str) -> str | None:
+    """Return GitHub blob URL (with file commit hash) for rel_path in source_path, or None."""
+    return _github_link_at(source_path, rel_path, int(time.time()) // _GITHUB_LINK_TTL_S)
+
+
+@lru_cache(maxsize=1024)
+def _github_link_at(source_path: str, rel_path: str, _epoch: int) -> str | None:
+    import subprocess
+    base = _github_base(source_path)
+    if base is None:
+        return None
+    try:
         # Commit hash of the last change to this file (fall back to HEAD)
         log = subprocess.run(
             ["git", "-C", source_path, "log", "-1", "--format=%H", "--", rel_path],
@@ -737,28 +1053,24 @@ def _github_link(source_path: str, rel_path: str) -> str | None:
 
 def _get_doc_node(cfg: KGConfig, slug: str) -> dict | None:
     """Fetch a _doc-* source file node from SQLite. Returns None if not found."""
-    import contextlib
     with contextlib.suppress(Exception):
-        from kg.db import get_conn
-        conn = get_conn(cfg)
-        row = conn.execute(
-            "SELECT title, bullet_count, created_at FROM nodes WHERE slug = ? AND type = 'doc'",
-            (slug,),
-        ).fetchone()
-        if row is None:
-            conn.close()
-            return None
-        title, bullet_count, created_at = row
-        # Also fetch source metadata to build a GitHub link
-        fs_row = conn.execute(
-            "SELECT rel_path, source_name FROM file_sources WHERE slug = ?",
-            (slug,),
-        ).fetchone()
-        chunks = conn.execute(
-            "SELECT id, text FROM bullets WHERE node_slug = ? ORDER BY id",
-            (slug,),
-        ).fetchall()
-        conn.close()
+        with _db_conn(cfg) as conn:
+            row = conn.execute(
+                "SELECT title, bullet_count, created_at FROM nodes WHERE slug = ? AND type = 'doc'",
+                (slug,),
+            ).fetchone()
+            if row is None:
+                return None
+            title, bullet_count, created_at = row
+            # Also fetch source metadata to build a GitHub link
+            fs_row = conn.execute(
+                "SELECT rel_path, source_name FROM file_sources WHERE slug = ?",
+                (slug,),
+            ).fetchone()
+            chunks = conn.execute(
+                "SELECT id, text FROM bullets WHERE node_slug = ? ORDER BY id",
+                (slug,),
+            ).fetchall()
 
         github_url: str | None = None
         if fs_row is not None:
@@ -781,7 +1093,7 @@ def _get_doc_node(cfg: KGConfig, slug: str) -> dict | None:
     return None
 
 
-def _render_doc_page(cfg: KGConfig, doc: dict, show_chunks: bool) -> str:
+def _render_doc_page(cfg: KGConfig, doc: dict, show_chunks: bool) -> Iterator[bytes]:
     """Render a _doc-* source file node with syntax-highlighted / markdown chunks."""
     slug = doc["slug"]
     title = doc["title"]  # relative path e.g. "src/kg/cli.py"
@@ -789,43 +1101,16 @@ def _render_doc_page(cfg: KGConfig, doc: dict, show_chunks: bool) -> str:
     n = doc["bullet_count"]
     created = f" · {doc['created_at'][:10]}" if doc.get("created_at") else ""
 
-    # Build chunks HTML
-    chunk_items: list[str] = []
-    for cid, text in doc["chunks"]:
-        esc = _html.escape(text)
-        chars = len(text)
-        hdr = (
-            f'<div class="chunk-hdr">'
-            f'<span>{_html.escape(cid)}</span>'
-            f'<span>{chars:,} chars</span>'
-            f'</div>'
-        )
-        if is_md:
-            content = (
-                f'<div class="md-body">'
-                f'<pre class="md-raw hidden">{esc}</pre>'
-                f'</div>'
-            )
-        else:
-            content = f'<pre><code class="language-{lang}">{esc}</code></pre>'
-        chunk_items.append(f'<div class="chunk">{hdr}{content}</div>')
-
-    vis = "" if show_chunks else " hidden"
-    chunks_section = (
-        f'<div id="chunks-section" class="chunks-section{vis}">{"".join(chunk_items)}</div>'
-        if chunk_items else ""
-    )
-
     github_url = doc.get("github_url")
     gh_link = (
-        f' <a href="{_html.escape(github_url)}" target="_blank" rel="noopener noreferrer"'
+        f' <a href="{_esc(github_url)}" target="_blank" rel="noopener noreferrer"'
         f' style="font-size:0.8rem;opacity:0.7;text-decoration:none" title="View on GitHub">GitHub ↗</a>'
         if github_url else ""
     )
     lbl = f"Show {n} chunk{'s' if n != 1 else ''}"
-    body = (
+    body = [
         f'<div style="display:flex;align-items:baseline;justify-content:space-between;flex-wrap:wrap;gap:12px;margin-bottom:8px">'
-        f'<h1><code style="font-size:1.1rem;background:none;padding:0">{_html.escape(title)}</code></h1>'
+        f'<h1><code style="font-size:1.1rem;background:none;padding:0">{_esc(title)}</code></h1>'
         f'<div style="display:flex;align-items:center;gap:12px">'
         f'{gh_link}'
         f'<label class="chunks-toggle">'
@@ -834,9 +1119,9 @@ def _render_doc_page(cfg: KGConfig, doc: dict, show_chunks: bool) -> str:
         f'</label>'
         f'</div>'
         f'</div>'
-        f'<p class="meta">{_badge("doc")} [{_html.escape(slug)}] · {n} chunk{"s" if n != 1 else ""} · {lang}{created}</p>'
-        + chunks_section
-    )
+        f'<p class="meta">{_BADGES["doc"]} [{_esc(slug)}] · {n} chunk{"s" if n != 1 else ""} · {lang}{created}</p>'
+    ]
+    chunks = _doc_chunks_html(doc["chunks"], lang, is_md, show_chunks) if doc["chunks"] else ()
 
     # CDN scripts
     extra_head = _HLJS_CSS + _HLJS_JS + (_MARKED_JS if is_md else "")
@@ -879,16 +1164,39 @@ def _render_doc_page(cfg: KGConfig, doc: dict, show_chunks: bool) -> str:
         toggle_js += "  if(typeof hljs!=='undefined')hljs.highlightAll();"
     toggle_js += "})();"
 
-    return _page(cfg, title, body, extra_head=extra_head, extra_script=toggle_js)
+    return _page_stream(cfg, title, itertools.chain(body, chunks), extra_head=extra_head, extra_script=toggle_js)
+
+
+def _doc_chunks_html(chunks: list, lang: str, is_md: bool, show_chunks: bool) -> Iterator[str]:
+    """Yield the chunks section one chunk at a time, so it is streamed rather than held."""
+    vis = "" if show_chunks else " hidden"
+    yield f'<div id="chunks-section" class="chunks-section{vis}">'
+    for cid, text in chunks:
+        esc = _esc(text)
+        hdr = (
+            f'<div class="chunk-hdr">'
+            f'<span>{_esc(cid)}</span>'
+            f'<span>{len(text):,} chars</span>'
+            f'</div>'
+        )
+        if is_md:
+            content = (
+                f'<div class="md-body">'
+                f'<pre class="md-raw hidden">{esc}</pre>'
+                f'</div>'
+            )
+        else:
+            content = f'<pre><code class="language-{lang}">{esc}</code></pre>'
+        yield f'<div class="chunk">{hdr}{content}</div>'
+    yield "</div>"
 
 
 def _agent_link_for_node(cfg: KGConfig, slug: str, node_type: str) -> str:
     """Return an HTML link to the agent page if this node is agent-related, else ''."""
-    import contextlib
 
     def _agent_link(name: str, label: str = "") -> str:
-        lbl = label or f"→ agent page ({_html.escape(name)})"
-        return f'<a href="/agent/{_html.escape(name)}" style="font-size:12px;color:var(--ac);margin-left:10px">{lbl}</a>'
+        lbl = label or f"→ agent page ({_esc(name)})"
+        return f'<a href="/agent/{_esc(name)}" style="font-size:12px;color:var(--ac);margin-left:10px">{lbl}</a>'
 
     def _toml_exists(name: str) -> bool:
         with contextlib.suppress(Exception):
@@ -918,77 +1226,114 @@ def _agent_link_for_node(cfg: KGConfig, slug: str, node_type: str) -> str:
     return ""
 
 
-def _render_node_page(cfg: KGConfig, node: FileNode, slugs: set[str]) -> str:
+def _render_node_page(cfg: KGConfig, node: FileNode, slugs: set[str]) -> Iterator[bytes]:
     path_slugs = _get_path_slugs(cfg)
-    items = []
+    bc = len(node.live_bullets)
+    s = "" if bc == 1 else "s"
+    created = f" · created {node.created_at[:10]}" if node.created_at else ""
+    agent_link = _agent_link_for_node(cfg, node.slug, node.type)
+    back_lnk = '<a href="/" style="font-size:12px;color:var(--mt);text-decoration:none">← all nodes</a>'
+    body = [
+        f'<div style="margin-bottom:8px">{back_lnk}</div>'
+        f'<h1 style="margin-top:4px">{_esc(node.title)}{agent_link}</h1>'
+        f'<p class="meta">{_BADGES.get(node.type) or _badge(node.type)} '
+        f'[{_esc(node.slug)}] · {bc} bullet{s}{created}</p>'
+        f'<div class="bullets">'
+    ]
     for b in node.live_bullets:
-        bc = f"b-{b.type}" if b.type in _BULLET_COLORS else ""
+        bcls = _BULLET_CLASS.get(b.type, "")
         sp = f' <span class="sp sp-{b.status}">({b.status})</span>' if b.status else ""
         votes = ""
         if b.useful or b.harmful:
             votes = f'<span class="vt">+{b.useful}/-{b.harmful}</span>'
-        items.append(
-            f'<div class="bullet {bc}">'
-            f'<span class="btp">{_html.escape(b.type)}</span>'
-            f'<span class="btx">{_render(b.text, slugs, path_slugs)}{sp}</span>'
+        body.append(
+            f'<div class="bullet {bcls}">'
+            f'<span class="btp">{_esc(b.type)}</span>'
+            f'<span class="btx">'
+        )
+        _render_into(body, b.text, slugs, path_slugs)
+        body.append(
+            f'{sp}</span>'
             f'{votes}'
-            f'<span class="bid">{_html.escape(b.id)}</span>'
+            f'<span class="bid">{_esc(b.id)}</span>'
             f'</div>'
         )
-    bc = len(node.live_bullets)
-    s = "" if bc == 1 else "s"
-    created = f" · created {node.created_at[:10]}" if node.created_at else ""
-    agent_link = _agent_link_for_node(cfg, node.slug, node.type)
-    back_lnk = '<a href="/" style="font-size:12px;color:var(--mt);text-decoration:none">← all nodes</a>'
-    body = (
-        f'<div style="margin-bottom:8px">{back_lnk}</div>'
-        f'<h1 style="margin-top:4px">{_html.escape(node.title)}{agent_link}</h1>'
-        f'<p class="meta">{_badge(node.type)} '
-        f'[{_html.escape(node.slug)}] · {bc} bullet{s}{created}</p>'
-        f'<div class="bullets">{"".join(items)}</div>'
-    )
+    body.append("</div>")
 
     from kg.indexer import get_backlinks
     from_slugs = get_backlinks(node.slug, cfg.db_path, cfg)
     bl = _backlinks_html(cfg, node.slug, from_slugs, slugs, path_slugs)
     if bl:
-        body += f"<h2>Referenced by</h2>{bl}"
+        body.append(f"<h2>Referenced by</h2>{bl}")
 
     # Related is lazy-loaded via JS to avoid blocking page render
-    body += _related_placeholder(node.slug)
+    body.append(_related_placeholder(node.slug))
 
-    return _page(cfg, node.title, body)
+    return _page_stream(cfg, node.title, body)
 
 
 def _backlinks_html(cfg: KGConfig, slug: str, from_slugs: list[str], slugs: set[str], path_slugs: dict[str, str] | None = None) -> str:
     """Render nodes that link to *slug*, grouped with their referencing bullets."""
     if not from_slugs:
         return ""
-    from kg.reader import FileStore
-    store = FileStore(cfg.nodes_dir)
+    refs = _backlink_refs_db(cfg, slug, from_slugs)
+    if refs is None:
+        refs = _backlink_refs_files(cfg, slug, from_slugs)
     parts: list[str] = []
-    for from_slug in sorted(from_slugs):
-        node = store.get(from_slug)
-        if node is None:
-            continue
-        refs = [b for b in node.live_bullets if f"[{slug}]" in b.text]
-        if not refs:
-            continue
-        title = _html.escape(node.title or from_slug)
-        bullets_html = "".join(
-            f'<div class="bullet"><span class="btx">{_render(b.text, slugs, path_slugs)}</span></div>'
-            for b in refs[:4]
-        )
+    for from_slug in sorted(refs):
+        title, texts = refs[from_slug]
         parts.append(
             f'<div class="sg">'
-            f'<h3><a href="/node/{from_slug}">{title}</a>'
-            f' <span style="font-weight:normal;color:var(--mt);font-size:12px">[{_html.escape(from_slug)}]</span></h3>'
-            f'<div class="bullets">{bullets_html}</div>'
-            f'</div>'
+            f'<h3><a href="/node/{from_slug}">{_esc(title)}</a>'
+            f' <span style="font-weight:normal;color:var(--mt);font-size:12px">[{_esc(from_slug)}]</span></h3>'
+            f'<div class="bullets">'
         )
+        for text in texts[:4]:
+            parts.append('<div class="bullet"><span class="btx">')
+            _render_into(parts, text, slugs, path_slugs)
+            parts.append("</span></div>")
+        parts.append("</div></div>")
     return "".join(parts)
 
 
+def _backlink_refs_db(cfg: KGConfig, slug: str, from_slugs: list[str]) -> dict[str, tuple[str, list[str]]] | None:
+    """{from_slug: (title, texts of live bullets citing [slug])} from SQLite, or None if the DB fails.
+
+    One query per 500 slugs (under SQLite's bound-parameter limit) instead of
+    opening and parsing every citing node's JSONL.  instr() rather than LIKE:
+    slugs contain '_', which LIKE treats as a wildcard.
+    """
+    needle = f"[{slug}]"
+    refs: dict[str, tuple[str, list[str]]] = {}
+    try:
+        with _db_conn(cfg) as conn:
+            for i in range(0, len(from_slugs), 500):
+                batch = from_slugs[i:i + 500]
+                rows = conn.execute(
+                    "SELECT n.slug, n.title, b.text FROM nodes n JOIN bullets b ON b.node_slug = n.slug"  # noqa: S608
+                    f" WHERE n.slug IN ({','.join('?' * len(batch))}) AND instr(b.text, ?) > 0"
+                    " ORDER BY b.rowid",
+                    (*batch, needle),
+                ).fetchall()
+                for s, title, text in rows:
+                    refs.setdefault(s, (title or s, []))[1].append(text)
+    except Exception:
+        return None
+    return refs
+
+
+def _backlink_refs_files(cfg: KGConfig, slug: str, from_slugs: list[str]) -> dict[str, tuple[str, list[str]]]:
+    """Same as _backlink_refs_db, read from the node files."""
+    from kg.reader import FileStore
+    needle = f"[{slug}]"
+    refs: dict[str, tuple[str, list[str]]] = {}
+    for from_slug, node in FileStore(cfg.nodes_dir).get_many(from_slugs).items():
+        texts = [b.text for b in node.live_bullets if needle in b.text]
+        if texts:
+            refs[from_slug] = (node.title or from_slug, texts)
+    return refs
+
+
 def _related_html(cfg: KGConfig, node: FileNode, exclude: set[str]) -> str:
     """Find semantically related nodes via search on this node's content."""
     query_parts = [node.title] + [b.text for b in node.live_bullets[:6]]
@@ -1006,7 +1351,7 @@ def _related_html(cfg: KGConfig, node: FileNode, exclude: set[str]) -> str:
             continue
         raw_title = r.get("title") or s
         if s.startswith("_doc-"):
-            title_html = f'<a href="/node/{s}"><code style="font-size:12px">{_html.escape(raw_title)}</code></a>'
+            title_html = f'<a href="/node/{s}"><code style="font-size:12px">{_esc(raw_title)}</code></a>'
             # Show first matching chunk as a short preview
             chunk_text = r["bullets"][0]["text"] if r.get("bullets") else ""
             preview = chunk_text[:200].replace("\n", " ").strip()
@@ -1014,7 +1359,7 @@ def _related_html(cfg: KGConfig, node: FileNode, exclude: set[str]) -> str:
                 preview += "…"
             preview_html = (
                 f'<span class="m" style="display:block;margin-top:2px;font-family:monospace;font-size:11px">'
-                f'{_html.escape(preview)}</span>'
+                f'{_esc(preview)}</span>'
             ) if preview else ""
             items.append(
                 f'<div class="node-row" style="flex-direction:column;align-items:flex-start">'
@@ -1022,11 +1367,11 @@ def _related_html(cfg: KGConfig, node: FileNode, exclude: set[str]) -> str:
                 f'</div>'
             )
         else:
-            title = _html.escape(raw_title)
+            title = _esc(raw_title)
             items.append(
                 f'<div class="node-row">'
                 f'<span class="t"><a href="/node/{s}">{title}</a></span>'
-                f'<span class="m">[{_html.escape(s)}]</span>'
+                f'<span class="m">[{_esc(s)}]</span>'
                 f'</div>'
             )
         if len(items) >= 6:
@@ -1049,7 +1394,7 @@ def _preview_json(cfg: KGConfig, slug: str) -> str:
 
 def _related_placeholder(slug: str) -> str:
     """Render a placeholder div + script that fetches /api/related/<slug> lazily."""
-    esc = _html.escape(slug)
+    esc = _esc(slug)
     # Build script without f-string braces to avoid escaping complexity
     script = (
         'fetch("/api/related/' + esc + '")'
@@ -1069,10 +1414,11 @@ def _render_search_page(
     query: str,
     results: list[dict],  # [{slug, title, bullets: [{text, bullet_id}]}]
     slugs: set[str],
-) -> str:
+) -> bytes:
+    query_html = _esc(query)
     if not results:
         body = (
-            f'<h1>"{_html.escape(query)}"</h1>'
+            f'<h1>"{query_html}"</h1>'
             f'<p class="meta">No results.</p>'
         )
         return _page(cfg, f"Search: {query}", body, q=query)
@@ -1080,61 +1426,50 @@ def _render_search_page(
     concept_results = [r for r in results if not r["slug"].startswith("_doc-")]
     doc_results = [r for r in results if r["slug"].startswith("_doc-")]
 
-    parts = []
+    # Each field is escaped once and everything is appended to one list per
+    # section; bullets render straight into it via _render_into.
+    parts: list[str] = []
     for r in concept_results:
         slug = r["slug"]
-        title = _html.escape(r.get("title") or slug)
-        node_href = f"/node/{slug}"
-        title_html = f'<a href="{node_href}">[[{_html.escape(slug)}]]</a> {title}'
-        items = []
-        for b in r["bullets"]:
-            items.append(
-                f'<div class="bullet">'
-                f'<span class="btx">{_render(b["text"], slugs)}</span>'
-                f'<span class="bid">{_html.escape(b["bullet_id"])}</span>'
-                f'</div>'
-            )
         parts.append(
             f'<div class="sg">'
-            f'<h3>{title_html}</h3>'
-            f'<div class="bullets">{"".join(items)}</div>'
-            f'</div>'
+            f'<h3><a href="/node/{slug}">[[{_esc(slug)}]]</a> {_esc(r.get("title") or slug)}</h3>'
+            f'<div class="bullets">'
         )
+        for b in r["bullets"]:
+            parts.append('<div class="bullet"><span class="btx">')
+            _render_into(parts, b["text"], slugs)
+            parts.append(f'</span><span class="bid">{_esc(b["bullet_id"])}</span></div>')
+        parts.append("</div></div>")
 
-    doc_parts = []
+    doc_parts: list[str] = []
     need_hljs = False
     need_marked = False
     for r in doc_results:
         slug = r["slug"]
         raw_title = r.get("title") or slug
-        title = _html.escape(raw_title)
-        node_href = f"/node/{slug}"
-        title_html = f'<a href="{node_href}"><code style="font-size:13px">{title}</code></a>'
         lang, is_md = _file_lang(raw_title)
         if is_md:
             need_marked = True
         else:
             need_hljs = True
-        items = []
+        doc_parts.append(
+            f'<div class="sg">'
+            f'<h3><a href="/node/{slug}"><code style="font-size:13px">{_esc(raw_title)}</code></a></h3>'
+        )
         for b in r["bullets"]:
             text = b["text"]
-            preview = text[:800] + ("…" if len(text) > 800 else "")
-            esc = _html.escape(preview)
+            esc = _esc(text[:800]) + ("…" if len(text) > 800 else "")
             if is_md:
                 chunk_html = f'<div class="md-body"><pre class="md-raw hidden">{esc}</pre></div>'
             else:
                 chunk_html = f'<pre style="margin:0"><code class="language-{lang}" style="font-size:11px;line-height:1.4">{esc}</code></pre>'
-            items.append(
+            doc_parts.append(
                 f'<div class="chunk" style="border-radius:6px;overflow:hidden;margin-bottom:6px">'
                 f'{chunk_html}'
                 f'</div>'
             )
-        doc_parts.append(
-            f'<div class="sg">'
-            f'<h3>{title_html}</h3>'
-            f'{"".join(items)}'
-            f'</div>'
-        )
+        doc_parts.append("</div>")
 
     docs_section = ""
     docs_btn = ""
@@ -1168,7 +1503,7 @@ def _render_search_page(
         )
 
     body = (
-        f'<h1>"{_html.escape(query)}"</h1>'
+        f'<h1>"{query_html}"</h1>'
         f'<p class="meta">{len(concept_results)} nodes matched  {docs_btn}</p>'
         + "".join(parts)
         + docs_section
@@ -1176,8 +1511,7 @@ def _render_search_page(
     return _page(cfg, f"Search: {query}", body, q=query, extra_head=extra_head, extra_script=extra_script)
 
 
-def _render_log_page(cfg: KGConfig, name: str, lines: int = 200) -> str:
-    import contextlib
+def _render_log_page(cfg: KGConfig, name: str, lines: int = 200) -> bytes:
     log_path = cfg.launcher_log_path if name == "launcher" else None
     if log_path is None:
         return _render_404(cfg, f"log/{name}")
@@ -1194,32 +1528,57 @@ def _render_log_page(cfg: KGConfig, name: str, lines: int = 200) -> str:
         "<script>setTimeout(function(){location.reload();},5000);</script>"
     )
     body = (
-        f'{back}<h1 style="margin-top:8px">{_html.escape(name)} log</h1>'
-        f'<p style="font-size:11px;color:var(--mt)">Last {lines} lines · {_html.escape(str(log_path))} · auto-refresh 5s</p>'
+        f'{back}<h1 style="margin-top:8px">{_esc(name)} log</h1>'
+        f'<p style="font-size:11px;color:var(--mt)">Last {lines} lines · {_esc(str(log_path))} · auto-refresh 5s</p>'
         f'<pre id="log-pre" style="font-size:11px;background:var(--bg);border:1px solid var(--bd);'
         f'border-radius:6px;padding:12px;overflow-x:auto;white-space:pre-wrap;'
         f'word-break:break-all;max-height:80vh;overflow-y:auto">'
-        f'{_html.escape(content)}</pre>'
+        f'{_esc(content)}</pre>'
         f'<script>var p=document.getElementById("log-pre");if(p)p.scrollTop=p.scrollHeight;</script>'
         f'{refresh_js}'
     )
     return _page(cfg, f"{name} log", body)
 
 
-def _render_404(cfg: KGConfig, what: str) -> str:
-    body = f'<h1>Not found</h1><p class="meta">{_html.escape(what)}</p>'
+def _render_404(cfg: KGConfig, what: str) -> bytes:
+    body = f'<h1>Not found</h1><p class="meta">{_esc(what)}</p>'
     return _page(cfg, "Not found", body)
 
 
 # ─── Search (FTS + vector + reranker) ─────────────────────────────────────────
 
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="kg-web-vec")
+
+
+def _vector_hits(query: str, cfg: KGConfig, k: int) -> list[tuple[str, float]]:
+    from kg.vector_client import search_vector
+    return search_vector(query, cfg, k=k)
+
+
+def _get_calibrations(cfg: KGConfig) -> dict[str, list[float]]:
+    """Return {key: quantile breaks} for the fts, fts_doc and vector calibrations."""
+    sig = _db_signature(cfg)
+    cached = _cached(_CALIBRATION_CACHE, cfg, sig)
+    if cached is not None:
+        return cached
+    result: dict[str, list[float]] = {}
+    with contextlib.suppress(Exception), _db_conn(cfg) as conn:
+        rows = conn.execute(
+            "SELECT key, breaks FROM calibration WHERE key IN ('fts', 'fts_doc', 'vector')"
+        ).fetchall()
+        result = {key: json.loads(breaks) for key, breaks in rows}
+        if sig is not None:
+            _CALIBRATION_CACHE[str(cfg.db_path)] = (sig, time.monotonic(), result)
+    return result
+
+
 def _do_search(query: str, cfg: KGConfig, limit: int = 30) -> list[dict]:
     """FTS + vector blend + reranker → ranked [{slug, title, bullets}]."""
-    import contextlib
-
-    from kg.db import get_conn
-    from kg.indexer import get_calibration, score_to_quantile, search_fts
+    from kg.indexer import score_to_quantile, search_fts
 
+    # Vector search (optional — requires vector server running) runs on a
+    # worker thread while FTS runs here; both spend their time outside the GIL
+    vec_hits = _SEARCH_POOL.submit(_vector_hits, query, cfg, limit * 3)
     raw = search_fts(query, cfg.db_path, limit=limit * 3, cfg=cfg)
 
     # Group by slug, track best FTS score (negated BM25, higher = better)
@@ -1235,11 +1594,9 @@ def _do_search(query: str, cfg: KGConfig, limit: int = 30) -> list[dict]:
             fts_scores[slug] = -r["rank"]
         groups[slug].append(r)
 
-    # Vector search (optional — requires vector server running)
     vec_scores: dict[str, float] = {}
     with contextlib.suppress(Exception):
-        from kg.vector_client import search_vector
-        for slug, score in search_vector(query, cfg, k=limit * 3):
+        for slug, score in vec_hits.result():
             if slug.startswith("_") and not slug.startswith("_doc-"):
                 continue
             vec_scores[slug] = float(score)
@@ -1255,16 +1612,21 @@ def _do_search(query: str, cfg: KGConfig, limit: int = 30) -> list[dict]:
     vec_w = cfg.search.vector_weight
     dual_bonus = cfg.search.dual_match_bonus
 
-    fts_cal = get_calibration("fts", cfg.db_path, cfg)
-    fts_doc_cal = get_calibration("fts_doc", cfg.db_path, cfg)
-    vec_cal = get_calibration("vector", cfg.db_path, cfg)
-    fts_breaks = fts_cal[1] if fts_cal else None
-    fts_doc_breaks = fts_doc_cal[1] if fts_doc_cal else None
-    vec_breaks = vec_cal[1] if vec_cal else None
-
-    fts_ranked = sorted(fts_scores.items(), key=lambda x: x[1], reverse=True)
-    n_fts = len(fts_ranked)
-    fts_rank_pos = {s: i for i, (s, _) in enumerate(fts_ranked)}
+    cal = _get_calibrations(cfg)
+    fts_breaks = cal.get("fts")
+    fts_doc_breaks = cal.get("fts_doc")
+    vec_breaks = cal.get("vector")
+
+    # Rank positions are only the fallback for slugs without a usable
+    # calibrated FTS score (no breaks, or vector-only hits)
+    n_fts = len(fts_scores)
+    fts_rank_pos: dict[str, int] = {}
+    if n_fts > 1 and any(
+        v <= 0 or not (fts_doc_breaks if s.startswith("_doc-") else fts_breaks)
+        for s, v in fts_scores.items()
+    ):
+        fts_ranked = sorted(fts_scores.items(), key=lambda x: x[1], reverse=True)
+        fts_rank_pos = {s: i for i, (s, _) in enumerate(fts_ranked)}
 
     def _score(slug: str) -> float:
         fts_raw = fts_scores.get(slug, 0.0)
@@ -1281,43 +1643,63 @@ def _do_search(query: str, cfg: KGConfig, limit: int = 30) -> list[dict]:
         bonus = dual_bonus if (fts_raw > 0 and vec_raw > 0) else 0.0
         return fts_w * fts_q + vec_w * vec_q + bonus
 
-    ranked = sorted(groups, key=_score, reverse=True)[:limit]
+    # A single hit needs no fusion (and is never reranked)
+    ranked = list(groups) if len(groups) == 1 else sorted(groups, key=_score, reverse=True)[:limit]
+
+    # Titles for the results, plus (when reranking) each node's first five
+    # live bullets as its candidate text, in one round trip
+    use_rerank = cfg.search.use_reranker and len(ranked) >= 2
+    titles: dict[str, str] = {}
+    excerpts: dict[str, list[str]] | None = None
+    if cfg.db_path.exists():
+        with contextlib.suppress(Exception), _db_conn(cfg) as conn:
+            ph = ",".join("?" * len(ranked))
+            if use_rerank:
+                rows = conn.execute(
+                    "SELECT n.slug, n.title, b.text FROM nodes n LEFT JOIN ("  # noqa: S608
+                    "  SELECT node_slug, text, ROW_NUMBER() OVER (PARTITION BY node_slug ORDER BY rowid) AS rn"
+                    f"  FROM bullets WHERE node_slug IN ({ph}) AND node_slug NOT GLOB '_doc-*'"
+                    f") b ON b.node_slug = n.slug AND b.rn <= 5 WHERE n.slug IN ({ph}) ORDER BY n.slug, b.rn",
+                    (*ranked, *ranked),
+                ).fetchall()
+                excerpts = {}
+                for slug, title, text in rows:
+                    titles[slug] = title
+                    texts = excerpts.setdefault(slug, [])
+                    if text is not None:
+                        texts.append(text)
+            else:
+                titles = dict(
+                    conn.execute(
+                        f"SELECT slug, title FROM nodes WHERE slug IN ({ph})",  # noqa: S608
+                        ranked,
+                    ).fetchall()
+                )
 
     # Cross-encoder rerank (skip for doc chunks — use node-level text)
-    if cfg.search.use_reranker and len(ranked) >= 2:
+    if use_rerank:
         with contextlib.suppress(Exception):
-            from kg.reader import FileStore
             from kg.reranker import rerank
-            store = FileStore(cfg.nodes_dir)
+            heads = titles
+            if excerpts is None:
+                # DB unavailable: read the node files
+                from kg.reader import FileStore
+                nodes = FileStore(cfg.nodes_dir).get_many(s for s in ranked if not s.startswith("_doc-"))
+                heads = {s: n.title for s, n in nodes.items()}
+                excerpts = {s: [b.text for b in n.live_bullets[:5]] for s, n in nodes.items()}
             candidates: list[tuple[str, str]] = []
             for slug in ranked:
                 if slug.startswith("_doc-"):
                     # Use chunk texts as candidate text
                     text = " ".join(b["text"] for b in groups[slug][:3])
                     candidates.append((slug, text))
-                else:
-                    node = store.get(slug)
-                    if node:
-                        text = node.title + " " + " ".join(b.text for b in node.live_bullets[:5])
-                        candidates.append((slug, text))
+                elif slug in excerpts:
+                    text = (heads[slug] or "") + " " + " ".join(excerpts[slug])
+                    candidates.append((slug, text))
             if len(candidates) >= 2:
                 reranked = rerank(query, candidates, cfg)
                 ranked = [s for s, _ in reranked]
 
-    # Fetch titles from DB
-    titles: dict[str, str] = {}
-    if cfg.db_path.exists():
-        with contextlib.suppress(Exception):
-            conn = get_conn(cfg)
-            ph = ",".join("?" * len(ranked))
-            titles = dict(
-                conn.execute(
-                    f"SELECT slug, title FROM nodes WHERE slug IN ({ph})",  # noqa: S608
-                    ranked,
-                ).fetchall()
-            )
-            conn.close()
-
     return [
         {"slug": s, "title": titles.get(s, s), "bullets": groups.get(s, [])}
         for s in ranked
@@ -1327,9 +1709,15 @@ def _do_search(query: str, cfg: KGConfig, limit: int = 30) -> list[dict]:
 # ─── Agent pages ──────────────────────────────────────────────────────────────
 
 
+@lru_cache(maxsize=256)
+def _agent_def(path: Path, mtime_ns: int, size: int) -> AgentDef:  # noqa: ARG001  (cache key)
+    """AgentDef.from_toml, re-parsed only when the file's (mtime, size) changes."""
+    from kg.agents.launcher import AgentDef  # type: ignore[attr-defined]
+    return AgentDef.from_toml(path)
+
+
 def _mux_agents(cfg: KGConfig) -> list[dict]:
     """Return agents list, merged from mux.db (runtime state), TOML defs (config), and messages.db (counts)."""
-    import contextlib
     import sqlite3
     agents_by_name: dict[str, dict] = {}
 
@@ -1349,10 +1737,10 @@ def _mux_agents(cfg: KGConfig) -> list[dict]:
     # 2. TOML definitions: toml_status (paused/draining), node, model
     agents_dir = cfg.root / ".kg" / "agents"
     if agents_dir.exists():
-        from kg.agents.launcher import AgentDef  # type: ignore[attr-defined]
         for path in sorted(agents_dir.glob("*.toml")):
             with contextlib.suppress(Exception):
-                defn = AgentDef.from_toml(path)
+                st = path.stat()
+                defn = _agent_def(path, st.st_mtime_ns, st.st_size)
                 if defn.name not in agents_by_name:
                     agents_by_name[defn.name] = {
                         "name": defn.name, "status": "idle",
@@ -1383,7 +1771,6 @@ def _mux_agents(cfg: KGConfig) -> list[dict]:
 
 def _mux_agent_messages(cfg: KGConfig, agent_name: str, limit: int = 100) -> list[dict]:
     """Return recent messages to/from agent_name from project-local messages.db."""
-    import contextlib
     import sqlite3
     msgs: list[dict] = []
     with contextlib.suppress(Exception):
@@ -1400,7 +1787,7 @@ def _mux_agent_messages(cfg: KGConfig, agent_name: str, limit: int = 100) -> lis
     return msgs
 
 
-def _render_agents_page(cfg: KGConfig) -> str:
+def _render_agents_page(cfg: KGConfig) -> bytes:
     all_agents = _mux_agents(cfg)
     slugs = _get_slugs_db(cfg)
 
@@ -1409,7 +1796,7 @@ def _render_agents_page(cfg: KGConfig) -> str:
     archived_agents = [a for a in all_agents if a.get("toml_status") == "archived"]
 
     def _make_card(a: dict) -> str:
-        name_e = _html.escape(a["name"])
+        name_e = _esc(a["name"])
         is_archived = a.get("toml_status") == "archived"
         # Runtime status badge
         rt_status = a.get("status", "idle")
@@ -1432,9 +1819,9 @@ def _render_agents_page(cfg: KGConfig) -> str:
         model = a.get("model", "")
         meta_parts = []
         if node:
-            meta_parts.append(f"node: {_html.escape(node)}")
+            meta_parts.append(f"node: {_esc(node)}")
         if model:
-            meta_parts.append(f"model: {_html.escape(model)}")
+            meta_parts.append(f"model: {_esc(model)}")
         last = (a.get("last_seen") or "")[:19]
         if last:
             meta_parts.append(last)
@@ -1447,7 +1834,7 @@ def _render_agents_page(cfg: KGConfig) -> str:
         for _ms in ("-mission", "-instructions"):
             _ms_slug = f"agent-{a['name']}{_ms}"
             if _ms_slug in slugs:
-                kg_links += f'<a href="/node/{_html.escape(_ms_slug)}" style="{_lnk_style}">mission</a>'
+                kg_links += f'<a href="/node/{_esc(_ms_slug)}" style="{_lnk_style}">mission</a>'
                 break
         kg_links_html = f'<div style="margin-top:6px">{kg_links}</div>' if kg_links else ""
         # Control buttons — fetch()-based to avoid mobile "insecure form" warnings
@@ -1561,10 +1948,136 @@ def _render_agents_page(cfg: KGConfig) -> str:
     return _page(cfg, "Agents", body)
 
 
-def _render_agent_page(cfg: KGConfig, agent_name: str, flash: str = "") -> str:
+# Agent page sessions list.  sessions_dir -> (dir mtime_ns, *.jsonl paths).  Creating or removing a session
+# bumps the directory mtime; appending to one does not, so file mtimes are
+# still stat'ed per request.
+_SESSION_GLOBS: dict[Path, tuple[int, list[Path]]] = {}
+
+
+@lru_cache(maxsize=1024)
+def _session_preview(path: Path, mtime_ns: int, size: int) -> str:  # noqa: ARG001  (cache key)
+    """First summary / user text of a session (≤100 chars), re-parsed only when the file changes."""
+    for turn in _parse_session(path):
+        if turn["type"] in ("summary", "user") and turn.get("text"):
+            return turn["text"][:100]
+    return ""
+
+
+def _agent_sessions(cfg: KGConfig, agent_name: str) -> list[tuple[str, str, str]]:
+    """Return (stem, mtime, preview) for an agent's sessions, newest first."""
     import datetime
 
-    agent_name_e = _html.escape(agent_name)
+    sessions_dir = cfg.sessions_dir / agent_name
+    try:
+        dir_mtime = sessions_dir.stat().st_mtime_ns
+    except OSError:
+        return []
+    hit = _SESSION_GLOBS.get(sessions_dir)
+    if hit is None or hit[0] != dir_mtime:
+        hit = (dir_mtime, list(sessions_dir.glob("*.jsonl")))
+        _SESSION_GLOBS[sessions_dir] = hit
+    stats: list[tuple[os.stat_result, Path]] = []
+    for p in hit[1]:
+        with contextlib.suppress(OSError):
+            stats.append((p.stat(), p))
+    stats.sort(key=lambda x: x[0].st_mtime, reverse=True)
+    sessions: list[tuple[str, str, str]] = []
+    for st, p in stats:
+        mtime = datetime.datetime.fromtimestamp(  # noqa: DTZ006
+            st.st_mtime
+        ).strftime("%Y-%m-%d %H:%M")
+        preview = ""
+        with contextlib.suppress(Exception):
+            preview = _session_preview(p, st.st_mtime_ns, st.st_size)
+        sessions.append((p.stem, mtime, preview))
+    return sessions
+
+
+def _sessions_html(cfg: KGConfig, agent_name: str) -> str:
+    """Render the agent page's Sessions section; empty if the agent has none."""
+    sessions = _agent_sessions(cfg, agent_name)
+    if not sessions:
+        return ""
+    agent_name_e = _esc(agent_name)
+    _sess_show = 5
+
+    def _session_row(sid: str, mtime: str, preview: str) -> str:
+        preview_html = (
+            f'<span style="color:var(--mt);font-size:11px;overflow:hidden;'
+            f'text-overflow:ellipsis;white-space:nowrap;flex:1;min-width:0">'
+            f'{_esc(preview)}{"…" if len(preview) == 100 else ""}</span>'
+        ) if preview else ""
+        return (
+            f'<div class="session-row" style="flex-wrap:nowrap;gap:8px">'
+            f'<a href="/agent/{agent_name_e}/session/{_esc(sid)}" style="flex-shrink:0">'
+            f'<code style="font-size:11px">{_esc(sid[:24])}</code></a>'
+            f'{preview_html}'
+            f'<span style="color:var(--mt);font-size:12px;flex-shrink:0">{mtime}</span>'
+            f'</div>'
+        )
+
+    recent = sessions[:_sess_show]
+    older = sessions[_sess_show:]
+    rows_html = "".join(_session_row(s, m, p) for s, m, p in recent)
+    older_html = ""
+    if older:
+        older_rows = "".join(_session_row(s, m, p) for s, m, p in older)
+        n_older = len(older)
+        older_html = (
+            f'<div id="sess-older" style="display:none">{older_rows}</div>'
+            f'<p style="margin-top:6px;font-size:12px">'
+            f'<a href="#" id="sess-older-toggle" style="color:var(--mt)" '
+            f'onclick="var o=document.getElementById(\'sess-older\'),'
+            f't=document.getElementById(\'sess-older-toggle\');'
+            f'o.style.display=o.style.display===\'none\'?\'block\':\'none\';'
+            f't.textContent=o.style.display===\'none\'?\'Show {n_older} older sessions\':\'Hide older sessions\';'
+            f'return false">Show {n_older} older sessions</a></p>'
+        )
+
+    # Check for live session — get session_id and runtime status from mux DB
+    live_sid = ""
+    with contextlib.suppress(Exception):
+        conn = sqlite3.connect(str(cfg.mux_db_path))
+        try:
+            row = conn.execute(
+                "SELECT session_id, status FROM agents WHERE name=?", (agent_name,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row and row[0] and row[1] == "running":
+            live_sid = row[0]
+    live_link = ""
+    if live_sid:
+        live_link = (
+            f'<div class="session-row" style="flex-wrap:nowrap;gap:8px;'
+            f'border-left:3px solid var(--ac);background:rgba(88,166,255,.06)">'
+            f'<a href="/agent/{agent_name_e}/session/{_esc(live_sid)}" style="flex-shrink:0">'
+            f'<code style="font-size:11px">{_esc(live_sid[:24])}</code></a>'
+            f'<span class="live-dot" style="flex-shrink:0"></span>'
+            f'<span style="color:var(--ac);font-size:11px;flex-shrink:0">live</span>'
+            f'</div>'
+        )
+    return (
+        f'<h2>Sessions</h2>'
+        f'<div class="session-list">{live_link}{rows_html}</div>'
+        f'{older_html}'
+    )
+
+
+def _sessions_placeholder(agent_name: str) -> str:
+    """Render a placeholder div + script that fetches /api/sessions/<agent> lazily."""
+    esc = _esc(agent_name)
+    script = (
+        'fetch("/api/sessions/' + esc + '")'
+        '.then(function(r){return r.text()})'
+        '.then(function(h){if(h){document.getElementById("kg-sessions").innerHTML=h}})'
+        '.catch(function(){})'
+    )
+    return f'<div id="kg-sessions"></div><script>{script}</script>'
+
+
+def _render_agent_page(cfg: KGConfig, agent_name: str, flash: str = "") -> bytes:
+    agent_name_e = _esc(agent_name)
 
     # Load agent runtime + TOML info
     agent_info: dict = {"status": "unknown", "toml_status": "running", "node": "", "model": ""}
@@ -1579,27 +2092,6 @@ def _render_agent_page(cfg: KGConfig, agent_name: str, flash: str = "") -> str:
     # Slugs for [[slug]] rendering in messages
     slugs = _get_slugs_db(cfg)
 
-    # Load sessions (reverse-chronological) with preview text
-    sessions_dir = cfg.sessions_dir / agent_name
-    sessions: list[tuple[str, str, str]] = []  # (stem, mtime, preview)
-    if sessions_dir.exists():
-        for p in sorted(sessions_dir.glob("*.jsonl"), key=lambda x: x.stat().st_mtime, reverse=True):
-            mtime = datetime.datetime.fromtimestamp(  # noqa: DTZ006
-                p.stat().st_mtime
-            ).strftime("%Y-%m-%d %H:%M")
-            preview = ""
-            import contextlib as _cl
-            with _cl.suppress(Exception):
-                turns = _parse_session(p)
-                for turn in turns:
-                    if turn["type"] == "summary" and turn.get("text"):
-                        preview = turn["text"][:100]
-                        break
-                    if turn["type"] == "user" and turn.get("text"):
-                        preview = turn["text"][:100]
-                        break
-            sessions.append((p.stem, mtime, preview))
-
     # Info bar
     ts = agent_info.get("toml_status", "running")
     rt = agent_info.get("status", "unknown")
@@ -1612,8 +2104,8 @@ def _render_agent_page(cfg: KGConfig, agent_name: str, flash: str = "") -> str:
     elif ts == "archived":
         ts_badge = '<span class="ag-status ag-archived" style="margin-left:6px">archived</span>'
 
-    node_val = _html.escape(agent_info.get("node", "") or "local")
-    model_val = _html.escape(agent_info.get("model", "") or "default")
+    node_val = _esc(agent_info.get("node", "") or "local")
+    model_val = _esc(agent_info.get("model", "") or "default")
     last_seen = (agent_info.get("last_seen") or "")[:19]
 
     # Links to agent's KG nodes — check which slugs exist
@@ -1622,12 +2114,12 @@ def _render_agent_page(cfg: KGConfig, agent_name: str, flash: str = "") -> str:
     # Main agent node: agent-<name>
     _agent_node_slug = f"agent-{agent_name}"
     if _agent_node_slug in slugs:
-        _node_links.append(f'<a href="/node/{_html.escape(_agent_node_slug)}" style="{_kg_link_style}">KG node</a>')
+        _node_links.append(f'<a href="/node/{_esc(_agent_node_slug)}" style="{_kg_link_style}">KG node</a>')
     # Mission node: agent-<name>-mission or agent-<name>-instructions (legacy)
     for _msuffix in ("-mission", "-instructions"):
         _mslugg = f"agent-{agent_name}{_msuffix}"
         if _mslugg in slugs:
-            _node_links.append(f'<a href="/node/{_html.escape(_mslugg)}" style="{_kg_link_style}">mission</a>')
+            _node_links.append(f'<a href="/node/{_esc(_mslugg)}" style="{_kg_link_style}">mission</a>')
             break
     _node_links_html = " · ".join(_node_links)
 
@@ -1670,23 +2162,23 @@ def _render_agent_page(cfg: KGConfig, agent_name: str, flash: str = "") -> str:
     # Message thread — latest on top for easy monitoring without scrolling
     thread_html = ""
     if messages:
-        items = ""
+        items: list[str] = []
         for m in reversed(messages):  # newest first
             is_in = m.get("to_agent") == agent_name
             is_urgent = m.get("urgency") == "urgent"
             cls = ("msg-in" + (" urgent" if is_urgent else "")) if is_in else "msg-out"
-            frm = _html.escape(m.get("from_agent") or "?")
+            frm = _esc(m.get("from_agent") or "?")
             msg_ts = (m.get("timestamp") or "")[:19]
             urg_tag = ' <span style="color:#f87171;font-size:10px">URGENT</span>' if is_urgent else ""
-            # Render [[slug]] links and formatting in message bodies
-            body_html = _render(str(m.get("body", "")), slugs)
-            items += (
+            items.append(
                 f'<div class="msg {cls}">'
                 f'<div class="msg-hdr">{frm}{urg_tag} · {msg_ts}</div>'
-                f'<div class="msg-body">{body_html}</div>'
-                f'</div>'
+                f'<div class="msg-body">'
             )
-        thread_html = f'<h2>Messages</h2><div class="msg-thread" id="msg-thread">{items}</div>'
+            # Render [[slug]] links and formatting in message bodies
+            _render_into(items, str(m.get("body", "")), slugs)
+            items.append("</div></div>")
+        thread_html = f'<h2>Messages</h2><div class="msg-thread" id="msg-thread">{"".join(items)}</div>'
 
     # Chat form — always sends as urgent (injected into running session via heartbeat hook)
     # Form submissions use fetch() to avoid mobile browser "insecure site" warnings on HTTP.
@@ -1817,73 +2309,6 @@ def _render_agent_page(cfg: KGConfig, agent_name: str, flash: str = "") -> str:
         f'</script>'
     )
 
-    # Sessions list with preview — show 5 most recent, collapse the rest
-    sessions_html = ""
-    if sessions:
-        _sess_show = 5
-
-        def _session_row(sid: str, mtime: str, preview: str) -> str:
-            preview_html = (
-                f'<span style="color:var(--mt);font-size:11px;overflow:hidden;'
-                f'text-overflow:ellipsis;white-space:nowrap;flex:1;min-width:0">'
-                f'{_html.escape(preview)}{"…" if len(preview) == 100 else ""}</span>'
-            ) if preview else ""
-            return (
-                f'<div class="session-row" style="flex-wrap:nowrap;gap:8px">'
-                f'<a href="/agent/{agent_name_e}/session/{_html.escape(sid)}" style="flex-shrink:0">'
-                f'<code style="font-size:11px">{_html.escape(sid[:24])}</code></a>'
-                f'{preview_html}'
-                f'<span style="color:var(--mt);font-size:12px;flex-shrink:0">{mtime}</span>'
-                f'</div>'
-            )
-
-        recent = sessions[:_sess_show]
-        older = sessions[_sess_show:]
-        rows_html = "".join(_session_row(s, m, p) for s, m, p in recent)
-        older_html = ""
-        if older:
-            older_rows = "".join(_session_row(s, m, p) for s, m, p in older)
-            n_older = len(older)
-            older_html = (
-                f'<div id="sess-older" style="display:none">{older_rows}</div>'
-                f'<p style="margin-top:6px;font-size:12px">'
-                f'<a href="#" id="sess-older-toggle" style="color:var(--mt)" '
-                f'onclick="var o=document.getElementById(\'sess-older\'),'
-                f't=document.getElementById(\'sess-older-toggle\');'
-                f'o.style.display=o.style.display===\'none\'?\'block\':\'none\';'
-                f't.textContent=o.style.display===\'none\'?\'Show {n_older} older sessions\':\'Hide older sessions\';'
-                f'return false">Show {n_older} older sessions</a></p>'
-            )
-
-        # Check for live session — get session_id from mux DB
-        import contextlib as _ctxlib2
-        import sqlite3 as _sq2
-        live_sid = ""
-        with _ctxlib2.suppress(Exception):
-            _conn2 = _sq2.connect(str(cfg.mux_db_path))
-            _row2 = _conn2.execute(
-                "SELECT session_id FROM agents WHERE name=?", (agent_name,)
-            ).fetchone()
-            _conn2.close()
-            if _row2 and _row2[0]:
-                live_sid = _row2[0]
-        live_link = ""
-        if live_sid and rt == "running":
-            live_link = (
-                f'<div class="session-row" style="flex-wrap:nowrap;gap:8px;'
-                f'border-left:3px solid var(--ac);background:rgba(88,166,255,.06)">'
-                f'<a href="/agent/{agent_name_e}/session/{_html.escape(live_sid)}" style="flex-shrink:0">'
-                f'<code style="font-size:11px">{_html.escape(live_sid[:24])}</code></a>'
-                f'<span class="live-dot" style="flex-shrink:0"></span>'
-                f'<span style="color:var(--ac);font-size:11px;flex-shrink:0">live</span>'
-                f'</div>'
-            )
-        sessions_html = (
-            f'<h2>Sessions</h2>'
-            f'<div class="session-list">{live_link}{rows_html}</div>'
-            f'{older_html}'
-        )
-
     # Idle banner — shown when no session is running
     idle_banner = ""
     if rt != "running":
@@ -1948,24 +2373,48 @@ def _render_agent_page(cfg: KGConfig, agent_name: str, flash: str = "") -> str:
         f"{chat_form}"
         f"{live_feed}"
         f"{thread_html}"
-        f"{sessions_html}"
+        f"{_sessions_placeholder(agent_name)}"
         f"{auto_refresh}"
     )
     return _page(cfg, agent_name, body)
 
 
+# Session pages show at most this much of a tool call's input / result, so
+# _parse_session never keeps (or pretty-prints) more than that.
+_TOOL_INPUT_SHOWN = 2000
+_TOOL_RESULT_SHOWN = 3000
+_JSON_INDENT2 = json.JSONEncoder(indent=2)
+
+
+def _json_prefix(obj: Any, limit: int) -> str:
+    """json.dumps(obj, indent=2)[:limit], without encoding past the limit."""
+    parts: list[str] = []
+    n = 0
+    for chunk in _JSON_INDENT2.iterencode(obj):
+        parts.append(chunk)
+        n += len(chunk)
+        if n >= limit:
+            break
+    return "".join(parts)[:limit]
+
+
 def _parse_session(session_path: Path) -> list[dict]:
     """Parse Claude Code session JSONL into simplified turn list."""
-    import contextlib
     raw = []
-    with contextlib.suppress(Exception):
-        for line in session_path.read_text(encoding="utf-8", errors="replace").splitlines():
+    with contextlib.suppress(Exception), session_path.open("rb") as f:
+        # Stream lines as bytes: both parsers take UTF-8 directly, so only a
+        # line that fails strict decoding pays for a lenient decode, and the
+        # file is never held whole.
+        for line in f:
             if not line.strip():
                 continue
             try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
+                entry = _json_loads(line)
+            except ValueError:  # JSONDecodeError, or invalid UTF-8
+                try:
+                    entry = json.loads(line.decode("utf-8", errors="replace"))
+                except json.JSONDecodeError:
+                    continue
             t = entry.get("type", "")
             if t == "summary":
                 raw.append({"type": "summary", "text": entry.get("summary", "")})
@@ -1991,7 +2440,7 @@ def _parse_session(session_path: Path) -> list[dict]:
                                 tr_text = str(tr)
                             tool_results.append({
                                 "tool_use_id": c.get("tool_use_id", ""),
-                                "result": tr_text,
+                                "result": tr_text[:_TOOL_RESULT_SHOWN],
                             })
                     text = "\n".join(text_parts)
                     if text.strip():
@@ -2021,10 +2470,14 @@ def _parse_session(session_path: Path) -> list[dict]:
                             thinking_blocks.append(th)
                     elif c.get("type") == "tool_use":
                         inp = c.get("input", {})
-                        inp_str = json.dumps(inp, indent=2) if isinstance(inp, dict) else str(inp)
+                        inp_str = (
+                            _json_prefix(inp, _TOOL_INPUT_SHOWN) if isinstance(inp, dict)
+                            else str(inp)[:_TOOL_INPUT_SHOWN]
+                        )
                         tool_calls.append({
                             "name": c.get("name", "?"),
                             "input": inp_str,
+                            "args": inp if isinstance(inp, dict) else {},
                             "id": c.get("id", ""),
                         })
                 if text_parts or tool_calls or thinking_blocks:
@@ -2050,7 +2503,7 @@ def _parse_session(session_path: Path) -> list[dict]:
     return turns
 
 
-def _render_session_page(cfg: KGConfig, agent_name: str, session_id: str) -> str:
+def _render_session_page(cfg: KGConfig, agent_name: str, session_id: str) -> bytes:
     session_path = cfg.sessions_dir / agent_name / f"{session_id}.jsonl"
     if not session_path.exists():
         return _render_404(cfg, f"session {session_id}")
@@ -2060,25 +2513,21 @@ def _render_session_page(cfg: KGConfig, agent_name: str, session_id: str) -> str
 
     def _render_tool_call_html(tc: dict) -> str:
         tc_name = tc["name"]
-        try:
-            inp_parsed = json.loads(tc["input"])
-        except Exception:
-            inp_parsed = {}
-        summary = _tool_summary(tc_name, inp_parsed)
+        summary = _tool_summary(tc_name, tc["args"])
         if summary and summary.startswith("_fleeting-") and summary in slugs:
             summary_html = (
                 f' <a href="/node/{summary}" style="color:var(--ac);font-weight:normal;text-decoration:none">'
-                f'{_html.escape(summary)}</a>'
+                f'{_esc(summary)}</a>'
             )
         elif summary:
-            summary_html = f' <span style="color:var(--mt);font-weight:normal">{_html.escape(summary)}</span>'
+            summary_html = f' <span style="color:var(--mt);font-weight:normal">{_esc(summary)}</span>'
         else:
             summary_html = ""
-        inp_esc = _html.escape(tc["input"][:2000])
+        inp_esc = _esc(tc["input"])
         # Result HTML — placed INSIDE .tool-call so it's always visible (not hidden with input)
         result_html = ""
         if "result" in tc:
-            res_raw = tc["result"][:3000]
+            res_raw = tc["result"]
             res_html = _render_tool_result(res_raw, slugs)
             res_stripped = res_raw.strip()
             if "\n" not in res_stripped and len(res_stripped) <= 120:
@@ -2101,75 +2550,76 @@ def _render_session_page(cfg: KGConfig, agent_name: str, session_id: str) -> str
         return (
             f'<div class="tool-call">'
             f'<div class="tool-hdr" onclick="_tog(this)">'
-            f'<span class="arr">▶</span> {_html.escape(tc_name)}{summary_html}</div>'
+            f'<span class="arr">▶</span> {_esc(tc_name)}{summary_html}</div>'
             f'<div class="tool-body">{inp_esc}</div>'
             f'{result_html}'
             f'</div>'
         )
 
     def _render_assistant_turn_html(turn: dict) -> str:
-        thinking_html = ""
+        out = [
+            f'<div class="turn turn-assistant">'
+            f'<div class="turn-label">Assistant · {(turn.get("ts") or "")[:19]}</div>'
+        ]
         for th in turn.get("thinking", []):
-            th_esc = _html.escape(th[:4000])
-            thinking_html += (
+            out.append(
                 f'<div class="thinking-block">'
                 f'<div class="thinking-hdr" onclick="_tog(this)">'
                 f'<span class="arr">▶</span> 💭 thinking ({len(th)} chars)</div>'
-                f'<div class="thinking-body">{th_esc}</div>'
+                f'<div class="thinking-body">{_esc(th[:4000])}</div>'
                 f'</div>'
             )
-        tool_html = "".join(_render_tool_call_html(tc) for tc in turn.get("tool_calls", []))
-        text_html = _render(turn["text"], slugs) if turn["text"] else ""
-        return (
-            f'<div class="turn turn-assistant">'
-            f'<div class="turn-label">Assistant · {(turn.get("ts") or "")[:19]}</div>'
-            f'{thinking_html}'
-            f'<div class="turn-text">{text_html}</div>'
-            f'{tool_html}'
-            f'</div>'
-        )
-
-    # Build items, grouping consecutive "tool-only" assistant turns
-    items = ""
-    grp_html = ""       # Accumulated HTML for current tool group
+        out.append('<div class="turn-text">')
+        if turn["text"]:
+            _render_into(out, turn["text"], slugs)
+        out.append("</div>")
+        out += [_render_tool_call_html(tc) for tc in turn.get("tool_calls", [])]
+        out.append("</div>")
+        return "".join(out)
+
+    # Build items, grouping consecutive "tool-only" assistant turns.  Both are
+    # flat lists joined once at the end; repeated += on the (closure) group
+    # string was quadratic in the number of tool-only turns.
+    items: list[str] = []
+    grp: list[str] = []         # HTML for the current tool group
     grp_names: list[str] = []   # Tool names in current group
 
-    def _flush_grp() -> str:
-        nonlocal grp_html, grp_names
-        if not grp_html:
-            return ""
-        html = grp_html
-        names = grp_names
-        grp_html = ""
-        grp_names = []
-        n = len(names)
+    def _flush_grp() -> None:
+        if not grp:
+            return
+        n = len(grp_names)
         # Only wrap in a group when there are 2+ tool calls from separate turns
         if n < 2:
-            return html
-        names_str = ", ".join(_html.escape(nm) for nm in names[:6])
-        if n > 6:
-            names_str += f" +{n - 6} more"
-        return (
-            f'<div class="tool-group">'
-            f'<div class="tool-group-hdr" onclick="_tog(this)">'
-            f'<span class="arr">▶</span> <span class="tg-count">{n} tool calls</span>'
-            f' — {names_str}</div>'
-            f'<div class="tool-group-body">{html}</div>'
-            f'</div>'
-        )
+            items.extend(grp)
+        else:
+            names_str = ", ".join(_esc(nm) for nm in grp_names[:6])
+            if n > 6:
+                names_str += f" +{n - 6} more"
+            items.append(
+                f'<div class="tool-group">'
+                f'<div class="tool-group-hdr" onclick="_tog(this)">'
+                f'<span class="arr">▶</span> <span class="tg-count">{n} tool calls</span>'
+                f' — {names_str}</div>'
+                f'<div class="tool-group-body">'
+            )
+            items.extend(grp)
+            items.append("</div></div>")
+        grp.clear()
+        grp_names.clear()
 
     for turn in turns:
         if turn["type"] == "summary":
-            items += _flush_grp()
-            items += f'<div style="color:var(--mt);font-size:12px;font-style:italic;margin-bottom:8px">{_html.escape(turn["text"])}</div>'
+            _flush_grp()
+            items.append(f'<div style="color:var(--mt);font-size:12px;font-style:italic;margin-bottom:8px">{_esc(turn["text"])}</div>')
         elif turn["type"] == "user":
-            items += _flush_grp()
-            items += (
+            _flush_grp()
+            items.append(
                 f'<div class="turn turn-user">'
                 f'<div class="turn-label">User · {(turn.get("ts") or "")[:19]}</div>'
-                f'<div class="turn-text">{_render(turn["text"], slugs)}</div>'
-                f'</div>'
+                f'<div class="turn-text">'
             )
+            _render_into(items, turn["text"], slugs)
+            items.append("</div></div>")
         elif turn["type"] == "assistant":
             has_tools = bool(turn.get("tool_calls"))
             has_text = bool(turn.get("text", "").strip())
@@ -2177,16 +2627,16 @@ def _render_session_page(cfg: KGConfig, agent_name: str, session_id: str) -> str
             is_tool_only = has_tools and not has_text and not has_thinking
             if is_tool_only:
                 # Accumulate into group
-                grp_html += _render_assistant_turn_html(turn)
+                grp.append(_render_assistant_turn_html(turn))
                 grp_names.extend(tc["name"] for tc in turn.get("tool_calls", []))
             else:
-                items += _flush_grp()
-                items += _render_assistant_turn_html(turn)
+                _flush_grp()
+                items.append(_render_assistant_turn_html(turn))
 
-    items += _flush_grp()
+    _flush_grp()
 
     if not items:
-        items = '<p style="color:var(--mt)">Empty session or unrecognised format.</p>'
+        items.append('<p style="color:var(--mt)">Empty session or unrecognised format.</p>')
 
     # Session stats for header
     _n_user = sum(1 for t in turns if t["type"] == "user")
@@ -2203,7 +2653,7 @@ def _render_session_page(cfg: KGConfig, agent_name: str, session_id: str) -> str
         f'<p class="meta">{" · ".join(_stat_parts)}</p>'
     ) if _stat_parts else ""
 
-    _ae = _html.escape(agent_name)
+    _ae = _esc(agent_name)
     _bc_style = "font-size:12px;color:var(--mt);text-decoration:none"
     _sep = '<span style="color:var(--bd);margin:0 5px">/</span>'
     # Breadcrumb: ← agents / agent_name / mission / KG node
@@ -2214,18 +2664,18 @@ def _render_session_page(cfg: KGConfig, agent_name: str, session_id: str) -> str
     # Add mission + KG node links if they exist
     _node_slug = f"agent-{agent_name}"
     if _node_slug in slugs:
-        breadcrumb += f'{_sep}<a href="/node/{_html.escape(_node_slug)}" style="{_bc_style}">KG node</a>'
+        breadcrumb += f'{_sep}<a href="/node/{_esc(_node_slug)}" style="{_bc_style}">KG node</a>'
     for _ms in ("-mission", "-instructions"):
         _ms_slug = f"agent-{agent_name}{_ms}"
         if _ms_slug in slugs:
-            breadcrumb += f'{_sep}<a href="/node/{_html.escape(_ms_slug)}" style="{_bc_style}">mission</a>'
+            breadcrumb += f'{_sep}<a href="/node/{_esc(_ms_slug)}" style="{_bc_style}">mission</a>'
             break
 
     body = (
         f'<div style="margin-bottom:8px">{breadcrumb}</div>'
-        f'<h1 style="margin-top:4px">Session <code style="font-size:0.8em">{_html.escape(session_id[:20])}</code></h1>'
+        f'<h1 style="margin-top:4px">Session <code style="font-size:0.8em">{_esc(session_id[:20])}</code></h1>'
         f'{_stats_html}'
-        f'<div style="margin-top:12px">{items}</div>'
+        f'<div style="margin-top:12px">{"".join(items)}</div>'
     )
     return _page(cfg, f"Session — {agent_name}", body)
 
@@ -2249,7 +2699,7 @@ def _extract_turn_for_sse(entry: dict, slugs: set[str]) -> str | None:
         ts = entry.get("timestamp", "")[:19]
         return (
             f'<div class="turn turn-user">'
-            f'<div class="turn-label">User · {_html.escape(ts)}</div>'
+            f'<div class="turn-label">User · {_esc(ts)}</div>'
             f'<div class="turn-text">{_render(text, slugs)}</div>'
             f'</div>'
         )
@@ -2262,12 +2712,12 @@ def _extract_turn_for_sse(entry: dict, slugs: set[str]) -> str | None:
         tool_names = [c.get("name", "?") for c in content if isinstance(c, dict) and c.get("type") == "tool_use"]
         ts = entry.get("timestamp", "")[:19]
         tools_html = "".join(
-            f'<span class="badge bt-concept" style="margin-right:3px">{_html.escape(n)}</span>'
+            f'<span class="badge bt-concept" style="margin-right:3px">{_esc(n)}</span>'
             for n in tool_names[:5]
         )
         return (
             f'<div class="turn turn-assistant">'
-            f'<div class="turn-label">Assistant · {_html.escape(ts)}'
+            f'<div class="turn-label">Assistant · {_esc(ts)}'
             + (f" {tools_html}" if tools_html else "")
             + f'</div>'
             f'<div class="turn-text">{_render(text, slugs) if text.strip() else ""}</div>'
@@ -2276,13 +2726,27 @@ def _extract_turn_for_sse(entry: dict, slugs: set[str]) -> str | None:
     return None
 
 
+def _latest_session(sessions_dir: Path) -> tuple[Path, os.stat_result] | None:
+    """Return the most recently modified *.jsonl in sessions_dir and its stat, or None."""
+    from pathlib import Path as _Path
+    best: tuple[os.DirEntry[str], os.stat_result] | None = None
+    with contextlib.suppress(FileNotFoundError, NotADirectoryError), os.scandir(sessions_dir) as it:
+        for entry in it:
+            if not entry.name.endswith(".jsonl"):
+                continue
+            with contextlib.suppress(OSError):
+                st = entry.stat()
+                if best is None or st.st_mtime > best[1].st_mtime:
+                    best = (entry, st)
+    return (_Path(best[0].path), best[1]) if best is not None else None
+
+
 def _get_live_session_path(cfg: KGConfig, agent_name: str) -> Path | None:
     """Find the live Claude Code session transcript for a running agent.
 
     Queries the mux DB for the agent's current session_id, then finds the
     corresponding file in ~/.claude/projects/<encoded-path>/<session_id>.jsonl.
     """
-    import contextlib
     import sqlite3
     from pathlib import Path as _Path
     with contextlib.suppress(Exception):
@@ -2315,7 +2779,6 @@ def _stream_agent_events(cfg: KGConfig, agent_name: str, wfile: Any) -> None:
     Sends 'ping' keepalive every 25s.
     Runs in its own thread until the client disconnected (wfile write failure).
     """
-    import contextlib
     import sqlite3
     import time
 
@@ -2349,11 +2812,10 @@ def _stream_agent_events(cfg: KGConfig, agent_name: str, wfile: Any) -> None:
             conn.close()
 
     with contextlib.suppress(Exception):
-        if sessions_dir.exists():
-            files = sorted(sessions_dir.glob("*.jsonl"), key=lambda x: x.stat().st_mtime, reverse=True)
-            if files:
-                last_session_path[0] = files[0]
-                last_session_size[0] = files[0].stat().st_size
+        latest = _latest_session(sessions_dir)
+        if latest:
+            last_session_path[0], st = latest
+            last_session_size[0] = st.st_size
 
     with contextlib.suppress(Exception):
         lp = _get_live_session_path(cfg, agent_name)
@@ -2375,7 +2837,7 @@ def _stream_agent_events(cfg: KGConfig, agent_name: str, wfile: Any) -> None:
                 if not _line.strip():
                     continue
                 with contextlib.suppress(json.JSONDecodeError, Exception):
-                    _th = _extract_turn_for_sse(json.loads(_line), slugs)
+                    _th = _extract_turn_for_sse(_json_loads(_line), slugs)
                     if _th:
                         _all_turns.append(_th)
             if _all_turns:
@@ -2409,40 +2871,39 @@ def _stream_agent_events(cfg: KGConfig, agent_name: str, wfile: Any) -> None:
                     last_msg_id[0] = rows[-1][0]
                     changed = True
         with contextlib.suppress(Exception):
-            if sessions_dir.exists():
-                files = sorted(sessions_dir.glob("*.jsonl"), key=lambda x: x.stat().st_mtime, reverse=True)
-                if files:
-                    latest = files[0]
-                    size = latest.stat().st_size
-                    if latest != last_session_path[0]:
-                        last_session_path[0] = latest
-                        last_session_size[0] = size
-                        changed = True
-                        if not _send("thinking", "1"):
-                            return False
-                    elif size > last_session_size[0]:
-                        # Read new bytes and emit individual turns as they arrive
-                        new_bytes: bytes = b""
-                        with contextlib.suppress(Exception), latest.open("rb") as f:
-                            f.seek(last_session_size[0])
-                            new_bytes = f.read()
-                        last_session_size[0] = size
-                        changed = True
-                        if not _send("thinking", "1"):
-                            return False
-                        # Emit each new complete turn
-                        with contextlib.suppress(Exception):
-                            for line in new_bytes.decode("utf-8", errors="replace").splitlines():
-                                if not line.strip():
-                                    continue
-                                try:
-                                    entry = json.loads(line)
-                                    html = _extract_turn_for_sse(entry, slugs)
-                                    if html:
-                                        if not _send("turn", json.dumps({"html": html})):
-                                            return False
-                                except json.JSONDecodeError:
-                                    pass
+            newest = _latest_session(sessions_dir)
+            if newest:
+                latest, st = newest
+                size = st.st_size
+                if latest != last_session_path[0]:
+                    last_session_path[0] = latest
+                    last_session_size[0] = size
+                    changed = True
+                    if not _send("thinking", "1"):
+                        return False
+                elif size > last_session_size[0]:
+                    # Read new bytes and emit individual turns as they arrive
+                    new_bytes: bytes = b""
+                    with contextlib.suppress(Exception), latest.open("rb") as f:
+                        f.seek(last_session_size[0])
+                        new_bytes = f.read()
+                    last_session_size[0] = size
+                    changed = True
+                    if not _send("thinking", "1"):
+                        return False
+                    # Emit each new complete turn
+                    with contextlib.suppress(Exception):
+                        for line in new_bytes.decode("utf-8", errors="replace").splitlines():
+                            if not line.strip():
+                                continue
+                            try:
+                                entry = _json_loads(line)
+                                html = _extract_turn_for_sse(entry, slugs)
+                                if html:
+                                    if not _send("turn", json.dumps({"html": html})):
+                                        return False
+                            except json.JSONDecodeError:
+                                pass
         # Check live Claude Code session file (written incrementally during session)
         with contextlib.suppress(Exception):
             live_path = _get_live_session_path(cfg, agent_name)
@@ -2468,7 +2929,7 @@ def _stream_agent_events(cfg: KGConfig, agent_name: str, wfile: Any) -> None:
                             if not line.strip():
                                 continue
                             try:
-                                entry = json.loads(line)
+                                entry = _json_loads(line)
                                 html = _extract_turn_for_sse(entry, slugs)
                                 if html:
                                     if not _send("turn", json.dumps({"html": html})):
@@ -2554,6 +3015,18 @@ def _stream_agent_events(cfg: KGConfig, agent_name: str, wfile: Any) -> None:
 
 # ─── HTTP handler ─────────────────────────────────────────────────────────────
 
+_AGENT_NAME_RE = re.compile(r"^[a-z0-9_-]+$")
+
+
+# HTML responses are gzipped for clients that accept it.  The stylesheet is
+# served separately, but every page still carries ~6 KB of inline JS and an
+# index page is ~13 KB uncompressed; markup like this shrinks ~2.5-3x.  Level
+# 4 costs well under a millisecond for a typical page and is within ~5% of
+# level 6's size.
+_GZIP_LEVEL = 4
+_GZIP_MIN_BYTES = 1024
+
+
 class _Handler(BaseHTTPRequestHandler):
     cfg: KGConfig  # injected via make_handler()
 
@@ -2573,6 +3046,10 @@ class _Handler(BaseHTTPRequestHandler):
             self._api_related(path[13:])
         elif path.startswith("/api/preview/"):
             self._api_preview(path[13:])
+        elif path == _CSS_PATH:
+            self._static_css()
+        elif path.startswith("/api/sessions/"):
+            self._api_sessions(path[14:])
         elif path == "/agents":
             self._html(_render_agents_page(self.cfg))
         elif path.startswith("/agent/"):
@@ -2583,14 +3060,14 @@ class _Handler(BaseHTTPRequestHandler):
             self._html(_render_404(self.cfg, path), 404)
 
     def _index(self) -> None:
-        self._html(_render_index(self.cfg))
+        self._html_stream(_render_index(self.cfg))
 
     def _node(self, slug: str, show_chunks: bool) -> None:
         # Source file nodes live in SQLite, not FileStore
         if slug.startswith("_doc-"):
             doc = _get_doc_node(self.cfg, slug)
             if doc is not None:
-                self._html(_render_doc_page(self.cfg, doc, show_chunks))
+                self._html_stream(_render_doc_page(self.cfg, doc, show_chunks))
             else:
                 self._html(_render_404(self.cfg, slug), 404)
             return
@@ -2600,7 +3077,7 @@ class _Handler(BaseHTTPRequestHandler):
             self._html(_render_404(self.cfg, slug), 404)
             return
         slugs = _get_slugs_db(self.cfg)
-        self._html(_render_node_page(self.cfg, node, slugs))
+        self._html_stream(_render_node_page(self.cfg, node, slugs))
 
     def _search(self, query: str) -> None:
         if not query.strip():
@@ -2639,16 +3116,14 @@ class _Handler(BaseHTTPRequestHandler):
 
     def _agent_older_turns(self, agent_name: str, skip: int) -> None:
         """Return a batch of older turns (JSON) for lazy loading in the agent page."""
-        import contextlib
         _batch = 50
         slugs = _get_slugs_db(self.cfg)
         replay_path = _get_live_session_path(self.cfg, agent_name)
         if replay_path is None:
             sessions_dir = self.cfg.sessions_dir / agent_name
-            with contextlib.suppress(Exception):
-                files = sorted(sessions_dir.glob("*.jsonl"), key=lambda x: x.stat().st_mtime, reverse=True)
-                if files:
-                    replay_path = files[0]
+            latest = _latest_session(sessions_dir)
+            if latest:
+                replay_path = latest[0]
         turns: list[str] = []
         has_more = False
         if replay_path and replay_path.exists():
@@ -2660,7 +3135,7 @@ class _Handler(BaseHTTPRequestHandler):
                     if not line.strip():
                         continue
                     with contextlib.suppress(json.JSONDecodeError, Exception):
-                        th = _extract_turn_for_sse(json.loads(line), slugs)
+                        th = _extract_turn_for_sse(_json_loads(line), slugs)
                         if th:
                             all_turns.append(th)
                 # all_turns[-skip:] are already loaded; serve the batch before that
@@ -2676,7 +3151,6 @@ class _Handler(BaseHTTPRequestHandler):
         self.wfile.write(body)
 
     def do_POST(self) -> None:
-        import contextlib
 
         parsed = urllib.parse.urlparse(self.path)
         path = parsed.path
@@ -2728,7 +3202,7 @@ class _Handler(BaseHTTPRequestHandler):
         elif path == "/agents/create":
             name = form.get("name", [""])[0].strip()
             model = form.get("model", [""])[0].strip()
-            if name and re.match(r"^[a-z0-9_-]+$", name):
+            if name and _AGENT_NAME_RE.match(name):
                 # 1. Write .kg/agents/<name>.toml (restart="on-failure" to avoid restart loops)
                 with contextlib.suppress(Exception):
                     from kg.agents.launcher import create_agent_def  # type: ignore[attr-defined]
@@ -2774,8 +3248,6 @@ class _Handler(BaseHTTPRequestHandler):
             self.end_headers()
 
     def _api_related(self, slug: str) -> None:
-        import contextlib
-
         from kg.reader import FileStore
         node = FileStore(self.cfg.nodes_dir).get(slug)
         if node is None:
@@ -2788,6 +3260,14 @@ class _Handler(BaseHTTPRequestHandler):
         html = _related_html(self.cfg, node, from_slugs_set)
         self._html(html)
 
+    def _api_sessions(self, agent_name: str) -> None:
+        # The name becomes a path under sessions_dir: it must be one component
+        # (agent TOMLs may use any file stem, so no stricter pattern here)
+        if agent_name in ("", ".", "..") or "/" in agent_name or "\\" in agent_name or "\0" in agent_name:
+            self._html(_render_404(self.cfg, agent_name), 404)
+            return
+        self._html(_sessions_html(self.cfg, agent_name))
+
     def _api_preview(self, slug: str) -> None:
         payload = _preview_json(self.cfg, slug)
         encoded = payload.encode()
@@ -2797,14 +3277,84 @@ class _Handler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(encoded)
 
-    def _html(self, body: str, status: int = 200) -> None:
-        encoded = body.encode()
+    def _accepts_gzip(self) -> bool:
+        """True if the request's Accept-Encoding lists gzip without q=0."""
+        for part in self.headers.get("Accept-Encoding", "").split(","):
+            coding, _, params = part.partition(";")
+            if coding.strip().lower() == "gzip":
+                q = params.replace(" ", "").lower().removeprefix("q=")
+                try:
+                    return float(q or 1) > 0
+                except ValueError:
+                    return True
+        return False
+
+    def _html_stream(self, chunks: Iterable[bytes], status: int = 200) -> None:
+        """Send a page as _page_stream renders it; closing the connection ends the body."""
+        # Produce the first piece before committing to a status: a failure up
+        # to here still fails the request the same way _html's callers do
+        chunks = iter(chunks)
+        first = next(chunks, b"")
+        gz = self._accepts_gzip()
         self.send_response(status)
         self.send_header("Content-Type", "text/html; charset=utf-8")
+        if gz:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            if not gz:
+                self.wfile.write(first)
+                for chunk in chunks:
+                    self.wfile.write(chunk)
+                return
+            # Sync-flush after each piece so the browser can render as we go
+            z = zlib.compressobj(_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            for chunk in itertools.chain((first,), chunks):
+                self.wfile.write(z.compress(chunk) + z.flush(zlib.Z_SYNC_FLUSH))
+            self.wfile.write(z.flush())
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away
+        except Exception:
+            # The 200 is already out, so a clean close would pass the partial
+            # page off as complete: reset the connection instead
+            logger.exception("error while streaming %s", self.path)
+            self._abort_connection()
+
+    def _abort_connection(self) -> None:
+        """Close the client socket with a TCP reset (SO_LINGER 0) rather than a FIN."""
+        with contextlib.suppress(OSError):
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            self.connection.close()
+
+    def _html(self, body: str | bytes, status: int = 200) -> None:
+        encoded = body if isinstance(body, bytes) else body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if len(encoded) >= _GZIP_MIN_BYTES and self._accepts_gzip():
+            encoded = gzip.compress(encoded, compresslevel=_GZIP_LEVEL, mtime=0)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Vary", "Accept-Encoding")
         self.send_header("Content-Length", str(len(encoded)))
         self.end_headers()
         self.wfile.write(encoded)
 
+    def _static_css(self) -> None:
+        """Serve the stylesheet; its URL changes with its content, so it never goes stale."""
+        gz = self._accepts_gzip()
+        body = _CSS_GZIP if gz else _CSS_BYTES
+        self.send_response(200)
+        self.send_header("Content-Type", "text/css; charset=utf-8")
+        if gz:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
     def _redirect(self, loc: str) -> None:
         self.send_response(302)
         self.send_header("Location", loc)